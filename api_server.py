@@ -0,0 +1,281 @@
+"""
+Read-Only HTTP API
+==================
+Serves the bot's latest results as JSON straight from memory, so other
+tools can poll them as often as they like without touching Tustus:
+
+    GET /destinations   latest scraped list   {"count", "hash", "items"}
+    GET /diff           latest change         {"at", "added", "removed"}
+    GET /timings        last run's summary    {"run_id", "at", "duration_s", "outcome", "spans", ...}
+    GET /health         {"status": "ok", "resources": [...]}
+
+Bodies are serialized, hashed and gzipped once when the scheduler publishes
+a new result; requests only pick the prepared bytes. Every response carries
+an ETag (If-None-Match gets a 304) and is sent gzipped when the client
+accepts it; the gzip variant has its own ETag (a "-gz" suffix). The ETag
+only changes when the content does, so a result that did not change keeps
+answering 304.
+
+The server runs an asyncio loop in a background thread next to the
+scheduler, which refreshes the cache after every run:
+
+    python scheduler.py --daemon --serve
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime
+from http import HTTPStatus
+
+from snapshot_store import SnapshotStore
+
+MAX_HEADERS = 100
+IDLE_TIMEOUT = 30.0
+
+
+class _Resource:
+    """A prepared response body with its gzip variant and their ETags."""
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # Strong ETags identify the bytes, so the encodings need different ones
+        self.gzip_etag = f'"{digest}-gz"'
+        compressed = gzip.compress(self.body, compresslevel=6)
+        self.gzip_body = compressed if len(compressed) < len(self.body) else None
+
+
+class ApiCache:
+    """Latest results, ready to be written to the wire."""
+
+    def __init__(self):
+        self._resources = {}
+        self.health = _Resource({"status": "ok", "resources": []})
+
+    def publish(self, name, payload):
+        """
+        Replace a resource (a no-op if the content is unchanged).
+
+        Args:
+            name (str): Resource path without the leading slash
+            payload (dict): JSON-serializable content
+        """
+        resource = _Resource(payload)
+        current = self._resources.get(name)
+        if current is not None and current.etag == resource.etag:
+            return
+        # Swap in a new dict so the server thread never sees a half-updated one
+        resources = dict(self._resources)
+        resources[name] = resource
+        self._resources = resources
+        if current is None:
+            self.health = _Resource({"status": "ok", "resources": sorted(resources)})
+
+    def get(self, name):
+        return self._resources.get(name)
+
+    @property
+    def names(self):
+        return sorted(self._resources)
+
+    def load_snapshot(self, snapshot_store):
+        """
+        Seed the cache from the stored snapshot so the API answers before the first run.
+
+        Args:
+            snapshot_store (SnapshotStore): Store holding the last delivered list
+        """
+        state = snapshot_store.load()
+        if state.get("hash"):
+            self.publish_destinations(state["items"])
+        history = state.get("history") or []
+        if history:
+            change = history[-1]
+            self.publish("diff", {"at": change["at"], "added": change["added"], "removed": change["removed"]})
+
+    def publish_destinations(self, items):
+        self.publish("destinations", {"count": len(items), "hash": SnapshotStore.content_hash(items),
+                                      "items": list(items)})
+
+    def refresh(self, bot, run_summary=None):
+        """
+        Publish the results of a finished bot cycle.
+
+        Cycles that did not scrape (skipped, locked, failed) keep the
+        previous list; cycles without changes keep the previous diff.
+
+        Args:
+            bot (WhatsAppBot): Bot that just ran
+            run_summary (dict): The tracer's summary of the run
+        """
+        if bot is not None and bot.last_destinations:
+            self.publish_destinations(bot.last_destinations)
+        last_diff = getattr(bot, "last_diff", None)
+        if last_diff and (last_diff[0] or last_diff[1]):
+            at = (run_summary or {}).get("at") or datetime.now().isoformat(timespec="seconds")
+            self.publish("diff", {"at": at, "added": last_diff[0], "removed": last_diff[1]})
+        if run_summary:
+            self.publish("timings", run_summary)
+
+
+def _accepts_gzip(value):
+    for coding in value.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _etag_matches(value, etag):
+    if value.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in value.split(","))
+
+
+class ApiServer:
+    """Minimal asyncio HTTP/1.1 server for the ApiCache resources."""
+
+    def __init__(self, cache, host="127.0.0.1", port=8080):
+        """
+        Args:
+            cache (ApiCache): Resources to serve
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free one)
+        """
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.ready = threading.Event()
+
+        # Statistics
+        self.requests = 0
+        self.not_modified = 0
+
+    def _response(self, status, headers, body=b"", head=False):
+        """
+        Raw response; a HEAD response keeps Content-Length but carries no body.
+
+        A 304 has no Content-Length: it would have to be the length of the
+        full representation, and a 0 misleads caches.
+        """
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if status is not HTTPStatus.NOT_MODIFIED:
+            lines.append(f"Content-Length: {len(body)}")
+        head_bytes = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        return head_bytes if head else head_bytes + body
+
+    def _error(self, method, status, keep_alive, extra=None):
+        body = json.dumps({"error": status.phrase}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive" if keep_alive else "close"}
+        headers.update(extra or {})
+        return self._response(status, headers, body, head=method == "HEAD")
+
+    def handle(self, method, target, headers, keep_alive=True):
+        """
+        Build the raw response for one request.
+
+        Args:
+            method (str): Request method
+            target (str): Request target (path and optional query)
+            headers (dict): Request headers with lower-case names
+            keep_alive (bool): Whether the connection stays open
+
+        Returns:
+            bytes: Status line, headers and body
+        """
+        self.requests += 1
+        if method not in ("GET", "HEAD"):
+            return self._error(method, HTTPStatus.METHOD_NOT_ALLOWED, keep_alive, {"Allow": "GET, HEAD"})
+
+        name = target.split("?", 1)[0].strip("/")
+        if name == "health":
+            resource = self.cache.health
+        else:
+            resource = self.cache.get(name)
+            if resource is None:
+                known = name in ("destinations", "diff", "timings")
+                return self._error(method, HTTPStatus.SERVICE_UNAVAILABLE if known else HTTPStatus.NOT_FOUND, keep_alive)
+
+        body, etag = resource.body, resource.etag
+        use_gzip = resource.gzip_body is not None and _accepts_gzip(headers.get("accept-encoding", ""))
+        if use_gzip:
+            body, etag = resource.gzip_body, resource.gzip_etag
+
+        response_headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if _etag_matches(headers.get("if-none-match", ""), etag):
+            self.not_modified += 1
+            return self._response(HTTPStatus.NOT_MODIFIED, response_headers)
+
+        if use_gzip:
+            response_headers["Content-Encoding"] = "gzip"
+        return self._response(HTTPStatus.OK, response_headers, body, head=method == "HEAD")
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                    if len(headers) > MAX_HEADERS:
+                        break
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3 or len(headers) > MAX_HEADERS:
+                    writer.write(self._error("GET", HTTPStatus.BAD_REQUEST, False))
+                    break
+                method, target, version = parts
+                connection = headers.get("connection", "").lower()
+                keep_alive = (connection != "close" if version == "HTTP/1.1" else connection == "keep-alive")
+                # Request bodies are never read, so don't reuse a connection that sent one
+                if method not in ("GET", "HEAD") or headers.get("content-length", "0") != "0":
+                    keep_alive = False
+
+                writer.write(self.handle(method, target, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Serve until the task is cancelled."""
+        server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🌐 API listening on http://{self.host}:{self.port} (destinations, diff, timings, health)")
+        self.ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self):
+        """
+        Run the server on its own event loop in a daemon thread.
+
+        Returns:
+            threading.Thread: The server thread (already started and listening)
+        """
+        thread = threading.Thread(target=asyncio.run, args=(self.serve(),), name="api-server", daemon=True)
+        thread.start()
+        self.ready.wait(5)
+        return thread
@@ -0,0 +1,53 @@
+"""
+Atomic File Writes
+==================
+State files (snapshot, validators, outbox, caches, metrics) are written to
+a uniquely named temporary file next to the target and then moved over it
+with os.replace(). Readers never see a half-written file, and two writers
+of the same file (e.g. multi_target and the single-target bot sharing
+BOT_STATE_DIR) never overwrite each other's temporary file; the last
+complete write wins.
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_text(path, text):
+    """
+    Replace path with text in one step.
+
+    Args:
+        path (str): File to write; missing parent directories are created
+        text (str): New contents, written as UTF-8
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # mkstemp creates the file private to its owner
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, obj, **dump_options):
+    """
+    Replace path with obj serialized as JSON.
+
+    Args:
+        path (str): File to write; missing parent directories are created
+        obj: JSON-serializable value
+        **dump_options: Passed on to json.dumps (indent, separators, ...)
+    """
+    atomic_write_text(path, json.dumps(obj, **dump_options))
@@ -0,0 +1,140 @@
+"""
+Extraction Benchmark
+====================
+Compares the destination extraction strategies on synthetic dropdown
+pages with hundreds of destinations.
+
+In-process parsers (always run):
+    legacy-split  - the old innerHTML.split('</li>') string path
+    bs4           - BeautifulSoup parse of the page
+    lxml          - parse_destinations_html() (compiled XPath)
+
+Browser strategies (with --browser, needs Chrome):
+    per-li-text   - find_elements + li.text, one WebDriver call per item
+    single-script - _extract_target_data(), one execute_script call
+
+Usage:
+    python benchmarks/bench_extract.py [--sizes 100,500,1000] [--repeat 20] [--browser]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from whatsapp_bot import parse_destinations_html  # noqa: E402
+
+CITIES = ["פריז", "רומא", "לונדון", "ברלין", "אתונה", "Barcelona", "Prague", "Budapest", "Larnaca", "Tbilisi"]
+
+
+def _dedupe(items):
+    """Order-preserving dedup used by the legacy per-item extraction paths."""
+    return list(dict.fromkeys(items))
+
+
+def make_page(size):
+    """Build a page whose dropdown mimics the live markup: attributes, entities and nested tags."""
+    items = []
+    for i in range(size):
+        city = CITIES[i % len(CITIES)]
+        items.append(
+            f'<li class="dest_item" data-id="{i}" data-price="{99 + i % 400}">'
+            f'<span>{city}</span> &amp; {city} {i}</li>'
+        )
+    return (
+        '<html><head><meta charset="utf-8"></head><body>'
+        '<div class="search_by_text"><ul id="dropList_serach" class="hidden">'
+        + "".join(items)
+        + "</ul></div></body></html>"
+    )
+
+
+def legacy_split(html):
+    """The pre-existing innerHTML string-splitting extractor."""
+    inner = html.split('class="hidden">', 1)[1].split("</ul>", 1)[0]
+    extracted = []
+    for dest in inner.split("</li>"):
+        dest = dest.replace("<li>", "").strip()
+        if dest and len(dest) > 2:
+            extracted.append(dest)
+    return _dedupe(extracted)
+
+
+def bs4_parse(html):
+    """BeautifulSoup implementation of the same extraction."""
+    from bs4 import BeautifulSoup
+
+    drop_list = BeautifulSoup(html, "lxml").find(id="dropList_serach")
+    names = [" ".join(li.get_text(" ", strip=True).split()) for li in drop_list.find_all("li")]
+    return _dedupe([name for name in names if len(name) > 2])
+
+
+def measure(func, repeat):
+    """Run func repeat times and return (median, min) in milliseconds plus its last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings), result
+
+
+def run_browser(sizes, repeat):
+    """Compare per-item WebDriver reads with the single execute_script extractor."""
+    os.environ.setdefault("RESEND_API_KEY", "benchmark")
+    os.environ.setdefault("TO_EMAIL", "benchmark@example.com")
+    from selenium.webdriver.common.by import By
+    from whatsapp_bot import WhatsAppBot, build_chrome_driver
+
+    bot = WhatsAppBot()
+    bot.driver = build_chrome_driver()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in sizes:
+                page = Path(tmp) / f"dest_{size}.html"
+                page.write_text(make_page(size), encoding="utf-8")
+                bot.driver.get(page.as_uri())
+
+                def per_li_text():
+                    drop_list = bot.driver.find_element(By.ID, "dropList_serach")
+                    return _dedupe([li.text.strip() for li in drop_list.find_elements(By.TAG_NAME, "li")])
+
+                for name, func in (("per-li-text", per_li_text), ("single-script", bot._extract_target_data)):
+                    median, best, result = measure(func, max(1, repeat // 5))
+                    print(f"{size:>6} {name:<14} median {median:9.2f} ms  min {best:9.2f} ms  items {len(result)}")
+    finally:
+        bot.driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,500,1000", help="Comma-separated dropdown sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per strategy and size")
+    parser.add_argument("--browser", action="store_true", help="Also benchmark the Selenium strategies")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    print(f"{'size':>6} {'strategy':<14} timings")
+    for size in sizes:
+        page = make_page(size)
+        for name, func in (
+            ("legacy-split", lambda: legacy_split(page)),
+            ("bs4", lambda: bs4_parse(page)),
+            ("lxml", lambda: parse_destinations_html(page)),
+        ):
+            median, best, result = measure(func, args.repeat)
+            print(f"{size:>6} {name:<14} median {median:9.2f} ms  min {best:9.2f} ms  items {len(result)}")
+
+    if args.browser:
+        run_browser(sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
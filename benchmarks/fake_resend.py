@@ -0,0 +1,116 @@
+"""
+Fake Resend Server
+==================
+Minimal local stand-in for the Resend email API, for exercising
+email_delivery.py without sending real mail.
+
+Supports POST /emails and POST /emails/batch. Failures can be injected to
+test retry and outbox handling.
+
+Usage:
+    python benchmarks/fake_resend.py [--port 8025] [--fail-first 2] [--fail-status 429]
+    RESEND_API_URL=http://127.0.0.1:8025 python whatsapp_bot.py
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeResendHandler(BaseHTTPRequestHandler):
+    """Request handler; state lives on the server instance."""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._reply(422, {"statusCode": 422, "name": "validation_error", "message": "Invalid JSON"})
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.request_count += 1
+            should_fail = self.server.request_count <= self.server.fail_first
+
+        if should_fail:
+            status = self.server.fail_status
+            name = "rate_limit_exceeded" if status == 429 else "application_error"
+            self._reply(status, {"statusCode": status, "name": name, "message": "Injected failure"},
+                        headers={"Retry-After": "0"} if status == 429 else None)
+            return
+
+        if self.path.rstrip("/") == "/emails":
+            with self.server.lock:
+                self.server.sent.append(body)
+            self._reply(200, {"id": str(uuid.uuid4())})
+        elif self.path.rstrip("/") == "/emails/batch":
+            with self.server.lock:
+                self.server.sent.extend(body)
+            self._reply(200, {"data": [{"id": str(uuid.uuid4())} for _ in body]})
+        else:
+            self._reply(404, {"statusCode": 404, "name": "not_found", "message": "Unknown endpoint"})
+
+
+class FakeResendServer(ThreadingHTTPServer):
+    """Threaded HTTP server recording every email it accepts."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, fail_first=0, fail_status=500, latency=0.0, verbose=False):
+        super().__init__(("127.0.0.1", port), FakeResendHandler)
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.latency = latency
+        self.verbose = verbose
+        self.request_count = 0
+        self.sent = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        """Serve in a background thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Resend API")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many requests before succeeding")
+    parser.add_argument("--fail-status", type=int, default=500, help="HTTP status used for injected failures")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    server = FakeResendServer(args.port, args.fail_first, args.fail_status, args.latency, verbose=True)
+    print(f"📮 Fake Resend listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Fake Resend stopped.")
+
+
+if __name__ == "__main__":
+    main()
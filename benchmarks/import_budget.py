@@ -0,0 +1,83 @@
+"""
+Import-Time Budget
+==================
+Measures the cost of importing the bot's entry modules with
+`python -X importtime` and fails when a module goes over its budget or
+pulls in a heavy dependency that should only be imported on first use.
+
+Each module is imported in a fresh interpreter, several times, and the
+median cumulative import time is compared with the budget.
+
+Usage:
+    python benchmarks/import_budget.py [--budget-ms 150] [--runs 5] [--modules whatsapp_bot,scheduler]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["whatsapp_bot", "scheduler"]
+# Packages that must stay out of the import path of the entry modules
+DEFERRED_PACKAGES = ["selenium", "webdriver_manager", "resend", "requests", "lxml"]
+
+
+def measure(module):
+    """
+    Import module once in a fresh interpreter.
+
+    Returns:
+        tuple: (cumulative import time in ms, deferred packages that were imported)
+    """
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, env=dict(os.environ))
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr.strip()}")
+
+    cumulative_us = 0
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, sorted(loaded.intersection(DEFERRED_PACKAGES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Maximum median import time per module")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES))
+    args = parser.parse_args()
+
+    failures = 0
+    for module in args.modules.split(","):
+        samples = []
+        eager = []
+        for _ in range(args.runs):
+            elapsed_ms, eager = measure(module)
+            samples.append(elapsed_ms)
+        median_ms = statistics.median(samples)
+
+        ok = median_ms <= args.budget_ms and not eager
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {module:<14} {median_ms:7.1f} ms (budget {args.budget_ms:.0f} ms, "
+              f"min {min(samples):.1f}, max {max(samples):.1f})")
+        if eager:
+            print(f"   ⚠️ imported at module load: {', '.join(eager)}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Fixture Generator
+=================
+Regenerates the recorded destination-page fixtures used by the benchmark
+harness. The markup follows the live Tustus page: a hidden
+#dropList_serach list inside .search_by_text, surrounded by the usual
+header, scripts and footer, with attributes, entities and nested tags on
+the <li> items.
+
+Fixtures are stored gzip-compressed as fixtures/destinations_<size>.html.gz.
+
+Usage:
+    python benchmarks/make_fixtures.py [--sizes 10,500,10000]
+"""
+
+import argparse
+import gzip
+import random
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+DEFAULT_SIZES = (10, 500, 10000)
+
+CITIES = [
+    "פריז", "רומא", "לונדון", "ברלין", "אתונה", "ברצלונה", "פראג", "בודפשט", "לרנקה", "טביליסי",
+    "אמסטרדם", "וינה", "מילאנו", "ורשה", "בטומי", "סופיה", "רודוס", "כרתים", "דובאי", "ליסבון",
+]
+COUNTRIES = ["צרפת", "איטליה", "אנגליה", "גרמניה", "יוון", "ספרד", "צ'כיה", "הונגריה", "קפריסין", "גאורגיה"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="he" dir="rtl">
+<head>
+<meta charset="utf-8">
+<title>טוסטוס - טיסות ברגע האחרון</title>
+<link rel="stylesheet" href="/Content/site.css">
+<script src="https://www.googletagmanager.com/gtag/js?id=G-FIXTURE" async></script>
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+</head>
+<body>
+<header class="main_header"><a href="/Arkia/Home"><img src="/Content/images/logo.png" alt="Tustus"></a></header>
+<main>
+<div class="search_by_text" style="display:none">
+<input type="text" id="txt_search" placeholder="לאן טסים?">
+<ul id="dropList_serach" class="hidden">
+{items}
+</ul>
+</div>
+<section class="deals">{deals}</section>
+</main>
+<footer><p>&copy; Tustus &amp; Arkia</p></footer>
+<script src="/Scripts/jquery.min.js"></script>
+</body>
+</html>
+"""
+
+
+def make_page(size, seed=2025):
+    """Build a deterministic destination page with size <li> items."""
+    rng = random.Random(seed + size)
+    items = []
+    for i in range(size):
+        city = CITIES[i % len(CITIES)]
+        country = COUNTRIES[i % len(COUNTRIES)]
+        suffix = f" {i // len(CITIES)}" if i >= len(CITIES) else ""
+        price = rng.randint(49, 899)
+        items.append(
+            f'<li class="dest_item" data-dest="{i}" data-price="{price}" data-date="2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}">'
+            f'<span class="city">{city}{suffix}</span> &ndash; {country}</li>'
+        )
+    deals = "".join(f'<div class="deal"><img src="/img/deal{i}.jpg"><b>{CITIES[i]}</b></div>' for i in range(12))
+    return PAGE_TEMPLATE.format(items="\n".join(items), deals=deals)
+
+
+def fixture_path(size):
+    return FIXTURES_DIR / f"destinations_{size}.html.gz"
+
+
+def load_fixture(size):
+    """Return the fixture HTML for size as bytes, generating it if missing."""
+    path = fixture_path(size)
+    if not path.exists():
+        write_fixture(size)
+    return gzip.decompress(path.read_bytes())
+
+
+def write_fixture(size):
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    # mtime=0 keeps the compressed output byte-for-byte reproducible
+    with open(fixture_path(size), "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(make_page(size).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate benchmark fixtures")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    args = parser.parse_args()
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        write_fixture(size)
+        print(f"📝 {fixture_path(size).name}: {fixture_path(size).stat().st_size / 1024:.1f} KB compressed")
+
+
+if __name__ == "__main__":
+    main()
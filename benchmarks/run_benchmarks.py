@@ -0,0 +1,202 @@
+"""
+Offline Benchmark Harness
+=========================
+Runs the bot's hot path end to end against the local stand-in server
+(recorded fixtures + fake Resend) and reports latency percentiles and
+peak RSS for each case and page size.
+
+Cases:
+    scrape           WhatsAppBot.scrape_data() over the HTTP fast path
+    extract          parse_destinations_html() on the fixture
+    email            WhatsAppBot.send_email_update() to the fake Resend
+    match            SubscriptionIndex.match() for 1,000 subscribers
+    scrape-browser   scrape_data() forced through Selenium      (--browser)
+    extract-browser  WhatsAppBot._extract_target_data()         (--browser)
+
+Every case/size pair runs in its own process so peak RSS is not skewed by
+earlier cases.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10,500,10000] [--iterations 20]
+                                        [--latency 0.05] [--browser] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from make_fixtures import DEFAULT_SIZES, load_fixture  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+BASE_CASES = ["scrape", "extract", "email", "match"]
+MATCH_SUBSCRIBERS = 1000
+BROWSER_CASES = ["scrape-browser", "extract-browser"]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_case(case, size, url, iterations):
+    """
+    Run one benchmark case in this process (child mode).
+
+    Returns:
+        dict: Per-iteration timings in ms, item count and peak RSS
+    """
+    from whatsapp_bot import WhatsAppBot, build_chrome_driver, parse_destinations_html
+
+    timings = []
+    items = 0
+    quiet = io.StringIO()
+
+    with contextlib.redirect_stdout(quiet):
+        bot = WhatsAppBot()
+        driver = None
+        try:
+            if case == "extract":
+                html = load_fixture(size)
+                step = lambda: parse_destinations_html(html)
+            elif case == "email":
+                destinations = parse_destinations_html(load_fixture(size))
+                step = lambda: bot.send_email_update(destinations, diff=(destinations, [])) and destinations
+            elif case == "match":
+                from subscriptions import SubscriptionIndex
+                destinations = parse_destinations_html(load_fixture(size))
+                index = SubscriptionIndex()
+                for number in range(MATCH_SUBSCRIBERS):
+                    # Five terms each: a few real names, prefixes and misses
+                    name = destinations[number % len(destinations)]
+                    terms = [name, name.split()[0][:3] + "*", f"nowhere-{number}", f"city {number}*", "zz*"]
+                    index.add(f"user{number}@example.com", terms)
+                step = lambda: index.match(destinations)
+            elif case == "extract-browser":
+                driver = build_chrome_driver()
+                driver.get(url)
+                bot._wait_for_destinations(driver)
+                step = lambda: bot._extract_target_data(driver)
+            else:
+                step = lambda: bot.scrape_data(url)
+
+            for _ in range(iterations):
+                start = time.perf_counter()
+                result = step()
+                timings.append((time.perf_counter() - start) * 1000)
+                items = len(result or [])
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    return {
+        "case": case,
+        "size": size,
+        "items": items,
+        "timings_ms": timings,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "peak_child_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def spawn_case(case, size, server, iterations, state_dir):
+    """Run a case in a fresh interpreter wired to the stub server."""
+    env = dict(os.environ)
+    env.update({
+        "RESEND_API_URL": server.url,
+        "RESEND_API_KEY": "re_benchmark",
+        "FROM_EMAIL": "bench@example.com",
+        "TO_EMAIL": "bench@example.com",
+        "SECRETS_TARGET_URL": server.page_url(size),
+        "BOT_STATE_DIR": state_dir,
+        "METRICS_PATH": "",
+        "METRICS_PROM_PATH": "",
+        "PRECHECK_ENABLED": "false",
+        "EMAIL_RATE_LIMIT": "0",
+        "SCRAPE_MODE": "selenium" if case == "scrape-browser" else "http",
+    })
+    command = [sys.executable, __file__, "--child", case, "--sizes", str(size),
+               "--iterations", str(iterations), "--url", server.page_url(size)]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{case}/{size} failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(result):
+    timings = result["timings_ms"]
+    return {
+        "case": result["case"],
+        "size": result["size"],
+        "items": result["items"],
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p90_ms": round(percentile(timings, 90), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(max(timings), 3) if timings else 0.0,
+        "peak_rss_mb": round(result["peak_rss_kb"] / 1024, 1),
+        "peak_child_rss_mb": round(result["peak_child_rss_kb"] / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Page latency served by the stub, in seconds")
+    parser.add_argument("--browser", action="store_true", help="Include Selenium cases (needs Chrome)")
+    parser.add_argument("--cases", help="Comma-separated subset of cases to run")
+    parser.add_argument("--json", help="Write the summary to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.child:
+        print(json.dumps(run_case(args.child, sizes[0], args.url, args.iterations)))
+        return
+
+    cases = args.cases.split(",") if args.cases else BASE_CASES + (BROWSER_CASES if args.browser else [])
+    server = StubServer(page_latency=args.latency).start()
+    print(f"🧪 Stub server on {server.url}, {args.iterations} iterations, page latency {args.latency * 1000:.0f} ms")
+
+    summaries = []
+    header = f"{'case':<16} {'size':>6} {'items':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'RSS MB':>7} {'child MB':>8}"
+    print(header)
+    print("-" * len(header))
+    with tempfile.TemporaryDirectory() as state_dir:
+        for case in cases:
+            for size in sizes:
+                summary = summarize(spawn_case(case, size, server, args.iterations, state_dir))
+                summaries.append(summary)
+                print(f"{summary['case']:<16} {summary['size']:>6} {summary['items']:>6} {summary['p50_ms']:>9.2f} "
+                      f"{summary['p90_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f} "
+                      f"{summary['peak_rss_mb']:>7.1f} {summary['peak_child_rss_mb']:>8.1f}")
+
+    server.shutdown()
+    print(f"📮 Fake Resend accepted {len(server.sent)} emails")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Local Tustus Stand-in
+=====================
+Serves the recorded destination fixtures with configurable latency and
+answers the Resend email endpoints, so the whole bot can run offline.
+
+Endpoints:
+    GET  /destinations/<size>   fixture page (?latency=<seconds> overrides the default)
+    POST /emails                fake Resend single send
+    POST /emails/batch          fake Resend batch send
+
+Usage:
+    python benchmarks/stub_server.py [--port 8080] [--latency 0.2]
+    SECRETS_TARGET_URL=http://127.0.0.1:8080/destinations/500 \\
+        RESEND_API_URL=http://127.0.0.1:8080 python whatsapp_bot.py
+"""
+
+import argparse
+import time
+from urllib.parse import parse_qs, urlparse
+
+from fake_resend import FakeResendHandler, FakeResendServer
+from make_fixtures import load_fixture
+
+
+class StubHandler(FakeResendHandler):
+    """Adds fixture pages on top of the fake Resend endpoints."""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "destinations" or not parts[1].isdigit():
+            self._reply(404, {"statusCode": 404, "name": "not_found", "message": "Unknown page"})
+            return
+
+        size = int(parts[1])
+        body = self.server.page(size)
+        latency = float(parse_qs(parsed.query).get("latency", [self.server.page_latency])[0])
+        if latency:
+            time.sleep(latency)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(FakeResendServer):
+    """Fixture pages plus fake Resend on one local port."""
+
+    def __init__(self, port=0, page_latency=0.0, **kwargs):
+        super().__init__(port, **kwargs)
+        self.RequestHandlerClass = StubHandler
+        self.page_latency = page_latency
+        self._pages = {}
+
+    def page(self, size):
+        """Decompressed fixture for size, cached in memory after first use."""
+        if size not in self._pages:
+            self._pages[size] = load_fixture(size)
+        return self._pages[size]
+
+    def page_url(self, size):
+        return f"{self.url}/destinations/{size}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Tustus and Resend stand-in")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay each page response")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, page_latency=args.latency, verbose=True)
+    print(f"🧪 Stub server listening on {server.url} (pages: /destinations/<size>)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stub server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Persistent Chrome Profiles
+==========================
+Keeps Chrome's user-data-dir and disk cache between runs, so static assets,
+cookies and consent tokens do not have to be fetched again every cycle.
+
+Every concurrent Chrome needs its own user-data-dir, so the profile root
+holds one slot per session (slot-0, slot-1, ...). A slot is in use while
+Chrome's SingletonLock in it points at a live process on this host; locks
+left behind by a crash or restored from another machine's cache are
+cleared before the slot is reused.
+
+Before a slot is handed out its cache directories are trimmed back under
+the size cap, oldest files first. Chrome additionally gets the cap as
+--disk-cache-size so the HTTP cache stays bounded during a run.
+"""
+
+import os
+import socket
+import threading
+
+from process_tree import pid_alive
+
+# Cache directories inside a slot that may be trimmed; everything else
+# (cookies, local storage, preferences) is kept
+_CACHE_DIRS = ("cache", os.path.join("Default", "Cache"), os.path.join("Default", "Code Cache"),
+               os.path.join("Default", "GPUCache"))
+# Bookkeeping files of Chrome's simple cache backend, never evicted
+_CACHE_INDEX_FILES = {"index", "the-real-index"}
+_SINGLETON_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket")
+
+
+def _directory_files(path):
+    """(path, size, mtime) for every regular file below path."""
+    files = []
+    for directory, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(directory, name)
+            try:
+                stat = os.lstat(file_path)
+            except OSError:
+                continue
+            if not os.path.islink(file_path):
+                files.append((file_path, stat.st_size, stat.st_mtime))
+    return files
+
+
+def directory_size(path):
+    """Total size in bytes of the regular files below path."""
+    return sum(size for _, size, _ in _directory_files(path))
+
+
+class ChromeProfile:
+    """Hands out persistent, size-capped Chrome profile slots."""
+
+    def __init__(self, root, cache_limit_mb=200):
+        """
+        Args:
+            root (str): Directory holding the profile slots
+            cache_limit_mb (int): Maximum cache size per slot (0 disables trimming)
+        """
+        self.root = root
+        self.cache_limit = cache_limit_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._starting = set()
+
+        # Statistics
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+
+    def claim(self):
+        """
+        Reserve a free slot for a Chrome that is about to start.
+
+        Call launched() once Chrome is up (or failed to start) so the slot
+        is guarded by Chrome's own lock from then on.
+
+        Returns:
+            str: Absolute path of the slot's user-data-dir
+        """
+        with self._lock:
+            index = 0
+            while True:
+                slot = os.path.abspath(os.path.join(self.root, f"slot-{index}"))
+                if slot not in self._starting and not self._in_use(slot):
+                    self._starting.add(slot)
+                    break
+                index += 1
+
+        try:
+            os.makedirs(slot, exist_ok=True)
+            self._clear_stale_locks(slot)
+            self.trim(slot)
+        except Exception:
+            self.launched(slot)
+            raise
+        return slot
+
+    def launched(self, slot):
+        """Drop the in-process reservation taken by claim()."""
+        with self._lock:
+            self._starting.discard(slot)
+
+    def cache_dir(self, slot):
+        """Disk cache directory to pass to Chrome for a slot."""
+        return os.path.join(slot, "cache")
+
+    def trim(self, slot):
+        """
+        Evict the oldest cache files of a slot until it fits the size cap.
+
+        Returns:
+            int: Bytes evicted
+        """
+        if not self.cache_limit:
+            return 0
+
+        files = []
+        for cache_dir in _CACHE_DIRS:
+            files.extend(_directory_files(os.path.join(slot, cache_dir)))
+        total = sum(size for _, size, _ in files)
+        if total <= self.cache_limit:
+            return 0
+
+        evicted = 0
+        for path, size, _ in sorted(files, key=lambda entry: entry[2]):
+            if total - evicted <= self.cache_limit:
+                break
+            if os.path.basename(path) in _CACHE_INDEX_FILES:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            evicted += size
+            self.evicted_files += 1
+
+        self.evicted_bytes += evicted
+        print(f"🧹 Chrome cache trimmed: {evicted / 1048576:.1f} MB evicted from {os.path.basename(slot)} "
+              f"(limit {self.cache_limit / 1048576:.0f} MB)")
+        return evicted
+
+    @staticmethod
+    def _lock_owner(slot):
+        """(hostname, pid) from Chrome's SingletonLock symlink, or None."""
+        try:
+            target = os.readlink(os.path.join(slot, "SingletonLock"))
+        except OSError:
+            return None
+        hostname, _, pid = target.rpartition("-")
+        return (hostname, int(pid)) if pid.isdigit() else (hostname, 0)
+
+    def _in_use(self, slot):
+        owner = self._lock_owner(slot)
+        return owner is not None and owner[0] == socket.gethostname() and pid_alive(owner[1])
+
+    def _clear_stale_locks(self, slot):
+        """Remove lock files left by a dead Chrome or another machine."""
+        if self._lock_owner(slot) is None:
+            return
+        for name in _SINGLETON_FILES:
+            try:
+                os.remove(os.path.join(slot, name))
+            except OSError:
+                pass
+        print(f"🔓 Cleared stale Chrome lock in {os.path.basename(slot)}")
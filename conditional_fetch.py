@@ -0,0 +1,151 @@
+"""
+Conditional Fetch Pre-Check
+===========================
+Cheap "has anything changed?" stage that runs before a browser is started.
+
+The target page is requested with the If-None-Match / If-Modified-Since
+validators saved from the last successful cycle. A 304 response, or a
+body whose fingerprint matches the previous run, means the cycle can stop
+early without Chrome and without sending an email.
+
+That shortcut is only trusted when the last committed cycle read the list
+from the static HTML. When the list is loaded by JavaScript the HTML shell
+(and its validators) can stay the same while the list changes, so those
+cycles always fall through to the scrape.
+"""
+
+import hashlib
+import json
+
+from atomic_file import atomic_write_json
+
+
+class PrecheckResult:
+    """Outcome of a conditional fetch."""
+
+    def __init__(self, unchanged, reason, body=None):
+        self.unchanged = unchanged
+        self.reason = reason
+        self.body = body
+
+
+class ConditionalFetcher:
+    """Keeps HTTP validators and a content fingerprint between runs."""
+
+    def __init__(self, path, headers=None, timeout=30):
+        """
+        Args:
+            path (str): Location of the JSON state file
+            headers (dict): Extra request headers (e.g. User-Agent)
+            timeout (float): Request timeout in seconds
+        """
+        self.path = path
+        self.headers = headers or {}
+        self.timeout = timeout
+        self._state = self._load()
+        self._pending = None
+
+    def _load(self):
+        """Read the saved validators and counters."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"url": None, "etag": None, "last_modified": None, "hash": None, "static_list": False,
+                    "checks": 0, "skips": 0}
+
+    def _save(self):
+        """Persist validators and counters atomically."""
+        atomic_write_json(self.path, self._state)
+
+    def check(self, url, fingerprint=None):
+        """
+        Ask the server whether the page changed since the last committed run.
+
+        Args:
+            url (str): The target website URL
+            fingerprint (callable): Optional function mapping the response body
+                to a stable string (defaults to the raw body). Used so that
+                volatile markup outside the destination list does not count
+                as a change. Returning None means the body cannot vouch for
+                the content (e.g. the list is rendered by JavaScript).
+
+        Returns:
+            PrecheckResult: unchanged=True when the cycle can be skipped
+        """
+        headers = dict(self.headers)
+        # Only a cycle that read the list from the static HTML makes a 304 or hash match meaningful
+        trusted = self._state.get("url") == url and self._state.get("static_list", False)
+        if trusted and self._state.get("etag"):
+            headers["If-None-Match"] = self._state["etag"]
+        if trusted and self._state.get("last_modified"):
+            headers["If-Modified-Since"] = self._state["last_modified"]
+
+        self._state["checks"] = self._state.get("checks", 0) + 1
+        # Deferred so importing the bot stays within benchmarks/import_budget.py
+        import requests
+
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._save()
+            return PrecheckResult(False, f"pre-check request failed: {e}")
+
+        if response.status_code == 304 and trusted:
+            return self._skip("server returned 304 Not Modified")
+
+        if response.status_code != 200:
+            self._save()
+            return PrecheckResult(False, f"server returned HTTP {response.status_code}")
+
+        body = response.content
+        content = fingerprint(body) if fingerprint else body
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        content_hash = hashlib.sha256(content).hexdigest() if content is not None else None
+
+        # Remember the new validators; they are only stored once the cycle succeeds
+        self._pending = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "hash": content_hash,
+        }
+
+        if trusted and content_hash is not None and content_hash == self._state.get("hash"):
+            return self._skip("content hash matches the previous run")
+
+        self._save()
+        reason = "content changed" if content_hash is not None else "page content cannot be fingerprinted"
+        return PrecheckResult(False, reason, body=body)
+
+    def _skip(self, reason):
+        """Count a skipped cycle and build its result."""
+        self._state["skips"] = self._state.get("skips", 0) + 1
+        if self._pending:
+            # Refresh validators (e.g. a new ETag for identical content)
+            self._state.update(self._pending)
+            self._pending = None
+        self._save()
+        return PrecheckResult(True, reason)
+
+    def commit(self, static_list=True):
+        """
+        Store the validators from the last check after a successful cycle.
+
+        Args:
+            static_list (bool): Whether the cycle's scrape read the list from
+                the static HTML; later pre-checks may only skip if it did
+        """
+        if self._pending:
+            self._state.update(self._pending)
+            self._state["static_list"] = bool(static_list and self._pending["hash"] is not None)
+            self._pending = None
+            self._save()
+
+    @property
+    def skip_rate(self):
+        """Tuple of (skips, checks, percentage) across all recorded runs."""
+        checks = self._state.get("checks", 0)
+        skips = self._state.get("skips", 0)
+        return skips, checks, (100.0 * skips / checks) if checks else 0.0
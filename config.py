@@ -2,92 +2,287 @@
 Configuration module for WhatsApp Bot
 =====================================
 Centralizes all configuration settings and provides validation.
+
+Every tunable is read from the environment (or .env) once per process into
+a frozen BotConfig. The bot, the scheduler and the helper modules all read
+that same object, so performance tuning never needs a code edit:
+
+    from config import get_config
+    config = get_config()
+    config.readiness_timeout
 """
 
 import os
-from pathlib import Path
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-class Config:
-    """Configuration class with all bot settings."""
-    
-    # ===== WEB SCRAPING SETTINGS =====
-    SECRETS_TARGET_URL = os.environ.get("SECRETS_TARGET_URL", "https://example.com")
-    CHROME_DRIVER_PATH = os.environ.get("CHROME_DRIVER_PATH", "chromedriver.exe")
-    SCRAPING_TIMEOUT = int(os.environ.get("SCRAPING_TIMEOUT", "30"))
-    
-    # ===== TWILIO API SETTINGS =====
-    TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
-    TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
-    TWILIO_WHATSAPP_NUMBER = os.environ.get("TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
-    
-    # ===== PERSONAL SETTINGS =====
-    MY_PHONE_NUMBER = os.environ.get("MY_PHONE_NUMBER")
-    
-    # ===== MESSAGE SETTINGS =====
-    MAX_ITEMS_PER_MESSAGE = int(os.environ.get("MAX_ITEMS_PER_MESSAGE", "20"))
-    
-    # ===== SELENIUM SETTINGS =====
-    HEADLESS_MODE = os.environ.get("HEADLESS_MODE", "True").lower() == "true"
-    WINDOW_SIZE = os.environ.get("WINDOW_SIZE", "1920,1080")
-    USER_AGENT = os.environ.get("USER_AGENT", 
-                               "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36")
+DEFAULT_SENDER = "onboarding@resend.dev"
+
+SCRAPE_MODES = ("auto", "http", "selenium")
+READINESS_STRATEGIES = ("li", "mutation")
+SCRAPE_ISOLATION_MODES = ("none", "process")
+BROWSER_PROFILES = ("standard", "lean")
+
+
+def _env_str(environ, name, default=""):
+    return environ.get(name, default).strip()
+
+
+def _env_bool(environ, name, default):
+    return _env_str(environ, name, "true" if default else "false").lower() == "true"
+
+
+def _env_number(environ, name, default, cast):
+    value = _env_str(environ, name, str(default))
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+
+def _env_list(environ, name, default="", lower=False):
+    values = [item.strip() for item in environ.get(name, default).split(",") if item.strip()]
+    return tuple(item.lower() for item in values) if lower else tuple(values)
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    """Typed, immutable bot settings."""
+
+    # ===== TARGET & STATE =====
+    target_url: str = ""
+    bot_state_dir: str = ".bot_state"
+    request_timeout: int = 30
+    run_lock_wait: float = 300.0               # seconds to wait for an overlapping cycle
+    run_lock_stale: float = 900.0              # seconds after which a held run lock is taken over
+    result_cache_ttl: float = 300.0            # seconds a scrape result is reused (0 disables)
+
+    # ===== SCRAPING =====
+    scrape_mode: str = "auto"                  # auto (HTTP, then Selenium), http or selenium
+    readiness_strategy: str = "li"             # li polls for the first item, mutation waits for a stable list
+    readiness_timeout: float = 20.0
+    readiness_stable_ms: int = 300
+    precheck_enabled: bool = True              # conditional GET before doing any real work
+    history_enabled: bool = True               # append every scrape to BOT_STATE_DIR/history.sqlite3
+    user_agent: str = DEFAULT_USER_AGENT
+
+    # ===== CHROME =====
+    chrome_driver_path: str = ""
+    headless: bool = True
+    window_size: str = "1920,1080"
+    block_resources: bool = True
+    block_resource_types: tuple = ("image", "font", "stylesheet", "media", "tracker")
+    block_allowed_domains: tuple = ()          # tracker hosts to keep; extension patterns apply everywhere
+    chrome_profile_dir: str = ""               # "" starts every Chrome with a fresh profile
+    chrome_cache_limit_mb: int = 200
+    browser_profile: str = "standard"          # "lean" trades viewport and parallelism for memory
+    lean_window_size: str = "1024,768"
+    renderer_process_limit: int = 2            # lean only
+    js_heap_mb: int = 256                      # lean only, V8 old-space cap per renderer
+    browser_sample_interval: float = 0.2       # seconds between RSS/CPU samples of the browser tree
+
+    # ===== PROCESS ISOLATION =====
+    scrape_isolation: str = "none"             # "process" runs each scrape in a supervised worker
+    scrape_deadline: float = 120.0
+    scrape_rss_limit_mb: int = 1024
+    scrape_worker_retries: int = 1
+
+    # ===== EMAIL =====
+    resend_api_key: str = ""
+    from_email: str = ""
+    to_emails: tuple = ()
+    email_subject: str = "Tustus Destinations Update"
+    email_max_retries: int = 4
+    email_rate_limit: float = 2.0              # requests per second
+    email_concurrency: int = 4
+    email_preview_size: int = 15               # items listed per section
+
+    # ===== SUBSCRIPTIONS =====
+    subscriptions_file: str = "subscriptions.json"   # per-subscriber watch lists (optional)
+
+    # ===== SCHEDULER =====
+    schedule_times: tuple = ("08:00", "11:00", "14:00", "17:00", "20:00")
+    driver_pool_size: int = 1
+    driver_max_uses: int = 20
+    poll_min_interval: int = 600               # seconds, used right after a change
+    poll_max_interval: int = 7200              # seconds, ceiling while the list is stable
+    poll_backoff: float = 1.5                  # growth factor per unchanged run
+    quiet_hours: str = ""                      # e.g. "23:00-07:00"
+
+    # ===== MULTI-TARGET ENGINE =====
+    watch_targets_file: str = "targets.json"
+    target_host_concurrency: int = 2
+    browser_contexts: int = 2
+
+    # ===== HTTP API =====
+    api_host: str = "127.0.0.1"
+    api_port: int = 8080
+
+    # ===== METRICS =====
+    metrics_path: str = "bot_metrics.jsonl"
+    metrics_prom_path: str = ""
+
+    # Headers for plain HTTP requests, derived from user_agent
+    http_headers: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "http_headers", {"User-Agent": self.user_agent, "Accept-Language": "he,en;q=0.8"})
+
     @classmethod
-    def validate_required_settings(cls):
+    def from_env(cls, environ=None):
         """
-        Validate that all required settings are present.
-        
+        Build a configuration from environment variables.
+
+        Args:
+            environ (dict): Variables to read, defaults to os.environ
+
         Returns:
-            tuple: (is_valid, missing_settings)
+            BotConfig: The parsed settings
+
+        Raises:
+            ValueError: If a numeric setting cannot be parsed
         """
-        required_settings = {
-            "TWILIO_ACCOUNT_SID": cls.TWILIO_ACCOUNT_SID,
-            "TWILIO_AUTH_TOKEN": cls.TWILIO_AUTH_TOKEN,
-            "MY_PHONE_NUMBER": cls.MY_PHONE_NUMBER,
-            "SECRETS_TARGET_URL": cls.SECRETS_TARGET_URL
-        }
-        
-        missing = [setting for setting, value in required_settings.items() if not value]
-        
-        return len(missing) == 0, missing
-    
-    @classmethod
-    def get_chrome_options(cls):
+        env = os.environ if environ is None else environ
+        defaults = cls()
+        block_types = ",".join(defaults.block_resource_types)
+        return cls(
+            target_url=_env_str(env, "SECRETS_TARGET_URL"),
+            bot_state_dir=_env_str(env, "BOT_STATE_DIR", defaults.bot_state_dir),
+            request_timeout=_env_number(env, "REQUEST_TIMEOUT", defaults.request_timeout, int),
+            run_lock_wait=_env_number(env, "RUN_LOCK_WAIT", defaults.run_lock_wait, float),
+            run_lock_stale=_env_number(env, "RUN_LOCK_STALE", defaults.run_lock_stale, float),
+            result_cache_ttl=_env_number(env, "RESULT_CACHE_TTL", defaults.result_cache_ttl, float),
+            scrape_mode=_env_str(env, "SCRAPE_MODE", defaults.scrape_mode).lower(),
+            readiness_strategy=_env_str(env, "READINESS_STRATEGY", defaults.readiness_strategy).lower(),
+            readiness_timeout=_env_number(env, "READINESS_TIMEOUT", defaults.readiness_timeout, float),
+            readiness_stable_ms=_env_number(env, "READINESS_STABLE_MS", defaults.readiness_stable_ms, int),
+            precheck_enabled=_env_bool(env, "PRECHECK_ENABLED", defaults.precheck_enabled),
+            history_enabled=_env_bool(env, "HISTORY_ENABLED", defaults.history_enabled),
+            user_agent=_env_str(env, "USER_AGENT", defaults.user_agent),
+            chrome_driver_path=_env_str(env, "CHROME_DRIVER_PATH"),
+            headless=_env_bool(env, "HEADLESS_MODE", defaults.headless),
+            window_size=_env_str(env, "WINDOW_SIZE", defaults.window_size),
+            block_resources=_env_bool(env, "BLOCK_RESOURCES", defaults.block_resources),
+            block_resource_types=_env_list(env, "BLOCK_RESOURCE_TYPES", block_types, lower=True),
+            block_allowed_domains=_env_list(env, "BLOCK_ALLOWED_DOMAINS", lower=True),
+            chrome_profile_dir=_env_str(env, "CHROME_PROFILE_DIR"),
+            chrome_cache_limit_mb=_env_number(env, "CHROME_CACHE_LIMIT_MB", defaults.chrome_cache_limit_mb, int),
+            browser_profile=_env_str(env, "BROWSER_PROFILE", defaults.browser_profile).lower(),
+            lean_window_size=_env_str(env, "LEAN_WINDOW_SIZE", defaults.lean_window_size),
+            renderer_process_limit=_env_number(env, "RENDERER_PROCESS_LIMIT", defaults.renderer_process_limit, int),
+            js_heap_mb=_env_number(env, "JS_HEAP_MB", defaults.js_heap_mb, int),
+            browser_sample_interval=_env_number(env, "BROWSER_SAMPLE_INTERVAL", defaults.browser_sample_interval,
+                                                float),
+            scrape_isolation=_env_str(env, "SCRAPE_ISOLATION", defaults.scrape_isolation).lower(),
+            scrape_deadline=_env_number(env, "SCRAPE_DEADLINE", defaults.scrape_deadline, float),
+            scrape_rss_limit_mb=_env_number(env, "SCRAPE_RSS_LIMIT_MB", defaults.scrape_rss_limit_mb, int),
+            scrape_worker_retries=_env_number(env, "SCRAPE_WORKER_RETRIES", defaults.scrape_worker_retries, int),
+            resend_api_key=_env_str(env, "RESEND_API_KEY"),
+            from_email=_env_str(env, "FROM_EMAIL"),
+            # TO_EMAIL may hold several comma-separated recipients
+            to_emails=_env_list(env, "TO_EMAIL"),
+            email_subject=_env_str(env, "EMAIL_SUBJECT") or defaults.email_subject,
+            email_max_retries=_env_number(env, "EMAIL_MAX_RETRIES", defaults.email_max_retries, int),
+            email_rate_limit=_env_number(env, "EMAIL_RATE_LIMIT", defaults.email_rate_limit, float),
+            email_concurrency=_env_number(env, "EMAIL_CONCURRENCY", defaults.email_concurrency, int),
+            email_preview_size=_env_number(env, "EMAIL_PREVIEW_SIZE", defaults.email_preview_size, int),
+            subscriptions_file=_env_str(env, "SUBSCRIPTIONS_FILE", defaults.subscriptions_file),
+            schedule_times=_env_list(env, "SCHEDULE_TIMES", ",".join(defaults.schedule_times)),
+            driver_pool_size=_env_number(env, "DRIVER_POOL_SIZE", defaults.driver_pool_size, int),
+            driver_max_uses=_env_number(env, "DRIVER_MAX_USES", defaults.driver_max_uses, int),
+            poll_min_interval=_env_number(env, "POLL_MIN_INTERVAL", defaults.poll_min_interval, int),
+            poll_max_interval=_env_number(env, "POLL_MAX_INTERVAL", defaults.poll_max_interval, int),
+            poll_backoff=_env_number(env, "POLL_BACKOFF", defaults.poll_backoff, float),
+            quiet_hours=_env_str(env, "QUIET_HOURS"),
+            watch_targets_file=_env_str(env, "WATCH_TARGETS_FILE", defaults.watch_targets_file),
+            target_host_concurrency=_env_number(env, "TARGET_HOST_CONCURRENCY", defaults.target_host_concurrency, int),
+            browser_contexts=_env_number(env, "BROWSER_CONTEXTS", defaults.browser_contexts, int),
+            api_host=_env_str(env, "API_HOST", defaults.api_host),
+            api_port=_env_number(env, "API_PORT", defaults.api_port, int),
+            metrics_path=_env_str(env, "METRICS_PATH", defaults.metrics_path),
+            metrics_prom_path=_env_str(env, "METRICS_PROM_PATH"),
+        )
+
+    @property
+    def sender(self):
+        """Address emails are sent from (Resend's shared sender when FROM_EMAIL is unset)."""
+        return self.from_email or DEFAULT_SENDER
+
+    @property
+    def network_stats(self):
+        """Whether Chrome's performance log is needed for network accounting."""
+        return self.block_resources or bool(self.chrome_profile_dir)
+
+    def validate(self):
         """
-        Get Chrome options for Selenium WebDriver.
-        
+        Check the settings without touching the network or the filesystem.
+
         Returns:
-            list: Chrome options as command line arguments
+            list: Human-readable problems (empty if the configuration is usable)
         """
-        options = [
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-gpu",
-            f"--window-size={cls.WINDOW_SIZE}",
-            "--disable-blink-features=AutomationControlled",
-            f"--user-agent={cls.USER_AGENT}"
-        ]
-        
-        if cls.HEADLESS_MODE:
-            options.append("--headless")
-        
-        return options
-    
-    @classmethod
-    def print_configuration(cls):
+        problems = []
+        required = {
+            "SECRETS_TARGET_URL": self.target_url,
+            "RESEND_API_KEY": self.resend_api_key,
+            "TO_EMAIL": self.to_emails,
+        }
+        problems += [f"{name} is not set" for name, value in required.items() if not value]
+
+        if self.target_url and not self.target_url.startswith(("http://", "https://")):
+            problems.append(f"SECRETS_TARGET_URL is not an http(s) URL: {self.target_url}")
+        problems += [f"TO_EMAIL entry is not an email address: {email}" for email in self.to_emails if "@" not in email]
+        if self.from_email and "@" not in self.from_email:
+            problems.append(f"FROM_EMAIL is not an email address: {self.from_email}")
+
+        choices = {
+            "SCRAPE_MODE": (self.scrape_mode, SCRAPE_MODES),
+            "READINESS_STRATEGY": (self.readiness_strategy, READINESS_STRATEGIES),
+            "SCRAPE_ISOLATION": (self.scrape_isolation, SCRAPE_ISOLATION_MODES),
+            "BROWSER_PROFILE": (self.browser_profile, BROWSER_PROFILES),
+        }
+        for name, (value, allowed) in choices.items():
+            if value not in allowed:
+                problems.append(f"{name}={value} is not one of: {', '.join(allowed)}")
+
+        if self.poll_min_interval > self.poll_max_interval:
+            problems.append("POLL_MIN_INTERVAL is larger than POLL_MAX_INTERVAL")
+        for run_time in self.schedule_times:
+            hours, _, minutes = run_time.partition(":")
+            if not (hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60):
+                problems.append(f"SCHEDULE_TIMES entry is not HH:MM: {run_time}")
+        return problems
+
+    def print_configuration(self):
         """Print current configuration (hiding sensitive data)."""
         print("🔧 Current Configuration:")
-        print(f"   Target URL: {cls.SECRETS_TARGET_URL}")
-        print(f"   Chrome Driver: {cls.CHROME_DRIVER_PATH}")
-        print(f"   Headless Mode: {cls.HEADLESS_MODE}")
-        print(f"   Max Items: {cls.MAX_ITEMS_PER_MESSAGE}")
-        print(f"   Twilio SID: {'✅ Set' if cls.TWILIO_ACCOUNT_SID else '❌ Missing'}")
-        print(f"   Auth Token: {'✅ Set' if cls.TWILIO_AUTH_TOKEN else '❌ Missing'}")
-        print(f"   Phone Number: {'✅ Set' if cls.MY_PHONE_NUMBER else '❌ Missing'}")
-
-# Create a default config instance
-config = Config()
+        print(f"   Target URL: {self.target_url or '❌ Missing'}")
+        print(f"   Scrape mode: {self.scrape_mode} (readiness {self.readiness_strategy}, "
+              f"{self.readiness_timeout:.0f}s timeout)")
+        print(f"   Chrome Driver: {self.chrome_driver_path or 'auto'}")
+        print(f"   Resource blocking: {', '.join(self.block_resource_types) if self.block_resources else 'off'}")
+        print(f"   Browser profile: {self.browser_profile}")
+        print(f"   Isolation: {self.scrape_isolation}")
+        print(f"   Recipients: {len(self.to_emails)} (from {self.sender})")
+        print(f"   Resend API key: {'✅ Set' if self.resend_api_key else '❌ Missing'}")
+        print(f"   Schedule: {', '.join(self.schedule_times)}")
+
+
+_config = None
+
+
+def get_config():
+    """
+    The process-wide configuration, loaded from the environment on first use.
+
+    Returns:
+        BotConfig: The shared settings
+    """
+    global _config
+    if _config is None:
+        _config = BotConfig.from_env()
+    return _config
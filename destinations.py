@@ -0,0 +1,89 @@
+"""
+Destination Records
+===================
+Structured form of a scraped dropdown item: the display name, a
+normalized key for matching the same destination across runs, and any
+price or date carried on the <li> attributes (data-price, data-date, ...).
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+_SEPARATORS = re.compile(r"[\s\-‐-―־,./|()]+")
+# Apostrophes and Hebrew geresh/gershayim are dropped, not split on ("ת\"א" -> "תא")
+_QUOTES = re.compile("['\"`’׳״]")
+# Hebrew final letters fold to their regular forms
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def destination_key(name):
+    """
+    Normalized matching key for a destination name.
+
+    Unicode-normalizes, strips accents and Hebrew niqqud, folds Hebrew
+    final letters, case-folds and collapses whitespace, dashes and
+    punctuation, so "Paris – France" and "paris-france" share a key, and
+    so do "Zürich" and "zurich".
+
+    Args:
+        name (str): Display name as scraped
+
+    Returns:
+        str: Key such as "paris france"
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    normalized = _QUOTES.sub("", stripped).casefold().translate(_FINAL_LETTERS)
+    return " ".join(part for part in _SEPARATORS.split(normalized) if part)
+
+
+def _parse_price(value):
+    """First number in an attribute value ("₪ 1,299" -> 1299.0), or None."""
+    match = _NUMBER.search(value.replace(",", ""))
+    return float(match.group()) if match else None
+
+
+@dataclass(frozen=True)
+class Destination:
+    """One destination seen in the dropdown."""
+
+    name: str
+    key: str
+    price: float = None
+    date: str = None
+
+    @classmethod
+    def from_item(cls, name, attributes=None):
+        """
+        Build a record from an item's text and its HTML attributes.
+
+        Any attribute whose name contains "price" or "date" (data-price,
+        data-min-price, data-date, ...) fills the matching field.
+
+        Args:
+            name (str): Whitespace-collapsed item text
+            attributes (dict): Attribute names and values of the <li>
+
+        Returns:
+            Destination: The record
+        """
+        price = date = None
+        for attribute, value in (attributes or {}).items():
+            attribute = attribute.lower()
+            value = (value or "").strip()
+            if not value:
+                continue
+            if price is None and "price" in attribute:
+                price = _parse_price(value)
+            elif date is None and "date" in attribute:
+                date = value
+        return cls(name=name, key=destination_key(name), price=price, date=date)
+
+
+def names(records):
+    """Display names of a record list (None stays None)."""
+    if records is None:
+        return None
+    return [record.name for record in records]
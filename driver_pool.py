@@ -0,0 +1,172 @@
+"""
+WebDriver Pool for WhatsApp Bot
+===============================
+Keeps one or more Chrome sessions warm between scheduled runs so each
+cycle does not pay the Chrome cold-start cost.
+
+Sessions are health-checked before every checkout and recycled after a
+configurable number of uses or as soon as a cycle reports them broken.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledDriver:
+    """Bookkeeping for a single pooled WebDriver session."""
+
+    def __init__(self, driver, startup_seconds):
+        self.driver = driver
+        self.uses = 0
+        self.startup_seconds = startup_seconds
+
+
+class DriverPool:
+    """Thread-safe pool of long-lived Selenium WebDriver sessions."""
+
+    def __init__(self, factory, size=1, max_uses=20):
+        """
+        Args:
+            factory (callable): Returns a new, ready-to-use WebDriver
+            size (int): Maximum number of concurrent sessions
+            max_uses (int): Recycle a session after this many checkouts
+        """
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+
+        self._idle = []
+        self._in_use = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Statistics
+        self.cold_starts = 0
+        self.reuses = 0
+        self.recycled = 0
+        self.startup_seconds_total = 0.0
+
+    def acquire(self, timeout=None):
+        """
+        Check out a healthy WebDriver, starting a new one if needed.
+
+        Args:
+            timeout (float): Seconds to wait for a free session (None waits forever)
+
+        Returns:
+            WebDriver: A session that passed its health check
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+
+                while self._idle:
+                    pooled = self._idle.pop()
+                    checkout_start = time.perf_counter()
+                    if self._is_healthy(pooled.driver):
+                        pooled.uses += 1
+                        self._in_use[id(pooled.driver)] = pooled
+                        self.reuses += 1
+                        logger.info(
+                            f"♻️ Reusing warm WebDriver (use {pooled.uses}/{self.max_uses}, "
+                            f"checkout {time.perf_counter() - checkout_start:.3f}s, "
+                            f"saved ~{pooled.startup_seconds:.1f}s startup)"
+                        )
+                        return pooled.driver
+                    logger.warning("⚠️ Pooled WebDriver failed health check, discarding")
+                    self._discard(pooled)
+
+                if len(self._in_use) < self.size:
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free WebDriver")
+                self._condition.wait(remaining)
+
+            # Reserve the slot before releasing the lock to start Chrome
+            placeholder = object()
+            self._in_use[id(placeholder)] = None
+
+        try:
+            start = time.perf_counter()
+            driver = self.factory()
+            startup_seconds = time.perf_counter() - start
+        except Exception:
+            with self._condition:
+                del self._in_use[id(placeholder)]
+                self._condition.notify()
+            raise
+
+        pooled = _PooledDriver(driver, startup_seconds)
+        pooled.uses = 1
+        with self._condition:
+            del self._in_use[id(placeholder)]
+            self._in_use[id(driver)] = pooled
+            self.cold_starts += 1
+            self.startup_seconds_total += startup_seconds
+
+        logger.info(f"🚀 Started new WebDriver in {startup_seconds:.2f}s (cold start #{self.cold_starts})")
+        return driver
+
+    def release(self, driver, broken=False):
+        """
+        Return a WebDriver to the pool.
+
+        Args:
+            driver (WebDriver): Session previously returned by acquire()
+            broken (bool): True if the cycle crashed and the session must be recycled
+        """
+        if driver is None:
+            return
+
+        with self._condition:
+            pooled = self._in_use.pop(id(driver), None)
+            if pooled is None:
+                logger.warning("⚠️ Released a WebDriver that does not belong to the pool")
+                return
+
+            if broken or self._closed or pooled.uses >= self.max_uses:
+                reason = "crash" if broken else "closed pool" if self._closed else f"{pooled.uses} uses"
+                logger.info(f"🔁 Recycling WebDriver ({reason})")
+                self.recycled += 1
+                self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+
+            self._condition.notify()
+
+    def close(self):
+        """Quit all idle sessions and refuse further checkouts."""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
+
+        logger.info(
+            f"🔒 Driver pool closed - cold starts: {self.cold_starts}, reuses: {self.reuses}, "
+            f"recycled: {self.recycled}, total startup time: {self.startup_seconds_total:.1f}s"
+        )
+
+    @staticmethod
+    def _is_healthy(driver):
+        """Cheap round-trip to make sure the browser session is still alive."""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(pooled):
+        """Quit a pooled session, ignoring errors from dead browsers."""
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
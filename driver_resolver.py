@@ -0,0 +1,119 @@
+"""
+ChromeDriver Resolution
+=======================
+Finds a chromedriver binary without asking webdriver_manager on every run.
+
+Resolution order:
+    1. an explicit path (CHROME_DRIVER_PATH) that exists;
+    2. a chromedriver on PATH whose major version matches Chrome;
+    3. a local cache keyed on the installed Chrome major version;
+    4. webdriver_manager, only on a cache miss (result is cached).
+
+The result is also memoized in-process, so a driver pool starting several
+sessions resolves once.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+
+from atomic_file import atomic_write_json
+
+_CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+_VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+")
+
+_resolved = None
+
+
+def _major_version(command):
+    """Run `<command> --version` and return its major version (None if unknown)."""
+    try:
+        output = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(output)
+    return match.group(1) if match else None
+
+
+def chrome_major_version():
+    """
+    Detect the installed Chrome/Chromium major version.
+
+    Returns:
+        str: Major version such as "140", or None if Chrome was not found
+    """
+    for binary in _CHROME_BINARIES:
+        path = shutil.which(binary)
+        if path:
+            version = _major_version(path)
+            if version:
+                return version
+    return None
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path, cache):
+    atomic_write_json(cache_path, cache, indent=2)
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def resolve_chromedriver(explicit_path=None, cache_path=None):
+    """
+    Locate a chromedriver binary, downloading one only as a last resort.
+
+    Args:
+        explicit_path (str): Configured driver path, used when it exists
+        cache_path (str): JSON file mapping Chrome major versions to driver paths
+
+    Returns:
+        tuple: (driver_path, source) where source is "explicit", "path",
+        "cache" or "webdriver_manager"
+    """
+    global _resolved
+    if _resolved and _is_executable(_resolved[0]):
+        return _resolved
+
+    if _is_executable(explicit_path):
+        _resolved = (os.path.abspath(explicit_path), "explicit")
+        return _resolved
+
+    chrome_major = chrome_major_version()
+
+    on_path = shutil.which("chromedriver")
+    if on_path:
+        driver_major = _major_version(on_path)
+        if chrome_major is None or driver_major is None or driver_major == chrome_major:
+            _resolved = (on_path, "path")
+            return _resolved
+        print(f"⚠️ chromedriver on PATH is v{driver_major} but Chrome is v{chrome_major}, ignoring it")
+
+    cache = _load_cache(cache_path) if cache_path else {}
+    cache_key = chrome_major or "unknown"
+    cached = cache.get(cache_key)
+    if _is_executable(cached):
+        _resolved = (cached, "cache")
+        return _resolved
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    driver_path = ChromeDriverManager().install()
+    if cache_path:
+        cache[cache_key] = driver_path
+        try:
+            _save_cache(cache_path, cache)
+        except OSError as e:
+            print(f"⚠️ Could not write chromedriver cache: {e}")
+    _resolved = (driver_path, "webdriver_manager")
+    return _resolved
@@ -0,0 +1,281 @@
+"""
+Email Delivery Queue
+====================
+Batched, concurrent delivery of Resend emails with retry and an on-disk
+outbox.
+
+Messages are queued during a cycle and sent together on flush():
+    - several messages go through the Resend batch endpoint (up to 100 per
+      request) when the installed SDK supports it, otherwise they are sent
+      individually from a small thread pool;
+    - every request passes a shared rate limiter;
+    - 429 and 5xx responses (and network errors) are retried with
+      exponential backoff and full jitter, honouring Retry-After;
+    - anything still failing is written to the outbox and retried on the
+      next flush; the bot flushes at least once per cycle, so the outbox is
+      retried even when a cycle has nothing new to send;
+    - a message may carry a key (e.g. "update:<url>"); a newer message with
+      the same key replaces the queued or outboxed one, so a change that is
+      re-detected while its first email is still pending goes out once.
+
+Point RESEND_API_URL at benchmarks/fake_resend.py to exercise it locally.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from atomic_file import atomic_write_text
+
+RESEND_BATCH_LIMIT = 100
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): Maximum calls per second (0 disables limiting)
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may make its next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _status_code(error):
+    """Best-effort HTTP status of a Resend SDK error (None if unknown)."""
+    code = getattr(error, "code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error):
+    """Rate limits, server errors and transport failures are worth retrying."""
+    import requests
+    from resend.exceptions import ResendError
+
+    if isinstance(error, ResendError):
+        status = _status_code(error)
+        return status is None or status == 429 or status >= 500
+    # Bugs in our own code (TypeError, KeyError, ...) fail fast
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def _retry_after(error):
+    """Retry-After header of a Resend SDK error (None if absent)."""
+    # The SDK keeps the server's header casing
+    headers = getattr(error, "headers", None) or {}
+    return next((value for name, value in headers.items() if name.lower() == "retry-after"), None)
+
+
+class DeliveryQueue:
+    """Queue of outgoing emails flushed in batches with retry."""
+
+    def __init__(self, outbox_path, max_retries=4, base_delay=1.0, max_delay=30.0,
+                 rate_limit=2.0, concurrency=4, use_batch=True, outbox_max_flushes=10, api_key=None):
+        """
+        Args:
+            outbox_path (str): JSON-lines file for messages that could not be sent
+            max_retries (int): Retries per request after the first attempt
+            base_delay (float): First backoff step in seconds
+            max_delay (float): Upper bound for a single backoff in seconds
+            rate_limit (float): Maximum Resend requests per second
+            concurrency (int): Parallel requests
+            use_batch (bool): Use the batch endpoint when available
+            outbox_max_flushes (int): Drop outbox messages after this many failed flushes
+            api_key (str): Resend API key, applied when the SDK is first loaded
+        """
+        self.outbox_path = outbox_path
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = max(1, concurrency)
+        self.use_batch = use_batch
+        self.outbox_max_flushes = outbox_max_flushes
+        self.api_key = api_key
+        self.rate_limiter = RateLimiter(rate_limit)
+        self._queue = []
+
+        # Statistics
+        self.flushes = 0
+
+    def enqueue(self, params, key=None):
+        """
+        Queue a message for the next flush.
+
+        Args:
+            params (dict): Resend send parameters (from, to, subject, html, ...)
+            key (str): Optional identity; supersedes earlier messages with the same key
+
+        Returns:
+            dict: The queued message, usable to check the flush outcome
+        """
+        message = {"params": params, "failed_flushes": 0, "queued_at": datetime.now().isoformat(timespec="seconds")}
+        if key:
+            message["key"] = key
+            self._queue = [queued for queued in self._queue if queued.get("key") != key]
+        self._queue.append(message)
+        return message
+
+    def flush(self):
+        """
+        Send every queued message plus anything left in the outbox.
+
+        Returns:
+            tuple: (sent, failed) lists of queued messages
+        """
+        self.flushes += 1
+        outbox = self._load_outbox()
+        keys = {message["key"] for message in self._queue if message.get("key")}
+        current = [message for message in outbox if message.get("key") not in keys]
+        if len(current) < len(outbox):
+            print(f"♻️ {len(outbox) - len(current)} outbox message(s) replaced by newer ones")
+        messages = current + self._queue
+        self._queue = []
+        if not messages:
+            return [], []
+
+        # The SDK is imported on first send so that runs without email stay cheap
+        import resend
+
+        if self.api_key:
+            resend.api_key = self.api_key
+
+        if self.use_batch and hasattr(resend, "Batch") and len(messages) > 1:
+            chunks = [messages[i:i + RESEND_BATCH_LIMIT] for i in range(0, len(messages), RESEND_BATCH_LIMIT)]
+            send_chunk = self._send_batch
+        else:
+            chunks = [[message] for message in messages]
+            send_chunk = self._send_single
+
+        sent, failed = [], []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as executor:
+            for chunk, results in zip(chunks, executor.map(send_chunk, chunks)):
+                for message, delivered in zip(chunk, results):
+                    (sent if delivered else failed).append(message)
+
+        self._write_outbox(failed)
+        print(f"📬 Delivery: {len(sent)} sent, {len(failed)} failed")
+        return sent, failed
+
+    def _send_single(self, chunk):
+        """Send one message through Emails.send; returns [delivered]."""
+        import resend
+
+        response, _ = self._with_retry(resend.Emails.send, chunk[0]["params"])
+        if response is None:
+            return [False]
+        print(f"📧 Email ID: {response.get('id')}")
+        return [True]
+
+    def _send_batch(self, chunk):
+        """
+        Send up to RESEND_BATCH_LIMIT messages through Batch.send.
+
+        The batch endpoint rejects the whole request when one message is
+        invalid (e.g. a malformed subscriber address), so a non-retryable
+        4xx falls back to sending the messages one by one.
+
+        Returns:
+            list: Delivered flag per message of the chunk
+        """
+        import resend
+
+        response, error = self._with_retry(resend.Batch.send, [message["params"] for message in chunk])
+        if response is not None:
+            data = response.get("data", []) if isinstance(response, dict) else []
+            print(f"📧 Batch sent: {len(data)} emails")
+            return [True] * len(chunk)
+
+        status = _status_code(error)
+        if status is not None and 400 <= status < 500 and status != 429:
+            print(f"↪️ Batch rejected ({status}), sending its {len(chunk)} messages individually")
+            return [self._send_single([message])[0] for message in chunk]
+        return [False] * len(chunk)
+
+    def _with_retry(self, send, payload):
+        """
+        Call send(payload) with rate limiting and exponential backoff.
+
+        Returns:
+            tuple: (response, error) where response is the Resend response,
+            or None once retries are exhausted, and error is the last exception
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                return send(payload), None
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    print(f"❌ Failed to send email: {e}")
+                    return None, e
+
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                retry_after = _retry_after(e)
+                if retry_after:
+                    try:
+                        delay = max(delay, min(self.max_delay, float(retry_after)))
+                    except ValueError:
+                        pass
+                print(f"⏳ Send failed ({_status_code(e) or 'network'}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+        return None, None
+
+    def _load_outbox(self):
+        """Read messages left over from earlier cycles."""
+        messages = []
+        try:
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        message = json.loads(line)
+                        # Outboxes written before the counter was renamed
+                        message.setdefault("failed_flushes", message.pop("cycles", 0))
+                        messages.append(message)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read outbox {self.outbox_path}: {e}")
+            return []
+
+        if messages:
+            print(f"📤 Retrying {len(messages)} message(s) from the outbox")
+        return messages
+
+    def _write_outbox(self, failed):
+        """Replace the outbox with the messages that still need sending."""
+        keep = []
+        for message in failed:
+            message["failed_flushes"] += 1
+            if message["failed_flushes"] > self.outbox_max_flushes:
+                print(f"🗑️ Dropping message to {message['params']['to']} after {self.outbox_max_flushes} failed flushes")
+            else:
+                keep.append(message)
+
+        if not keep:
+            if os.path.exists(self.outbox_path):
+                os.remove(self.outbox_path)
+            return
+
+        atomic_write_text(self.outbox_path, "".join(json.dumps(message, ensure_ascii=False) + "\n"
+                                                    for message in keep))
+        print(f"📥 {len(keep)} message(s) saved to the outbox for the next flush")
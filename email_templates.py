@@ -0,0 +1,148 @@
+"""
+Email Templates
+===============
+Renders the update email from the templates in templates/.
+
+The templates are read and compiled once per process. Scraped text is
+HTML-escaped before it reaches the HTML part, and every email also gets a
+plain-text alternative. Rendered bodies are cached by a hash of their
+content (destinations, diff and preview size), so the same result is only
+rendered once no matter how many subscribers receive it; the timestamp is
+filled in afterwards.
+"""
+
+import hashlib
+import html
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from string import Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Stand-in for the timestamp inside cached bodies (a private-use character
+# cannot appear in escaped scraped text by accident)
+_TIMESTAMP_MARK = "\ue000timestamp\ue000"
+
+_templates = {}
+
+
+def _read(name):
+    with open(os.path.join(TEMPLATES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _parse_fragments(text):
+    """Split a fragments file into {name: Template} on its [name] header lines."""
+    fragments = {}
+    name, lines = None, []
+    for line in text.splitlines():
+        if line.startswith("[") and line.endswith("]"):
+            if name:
+                fragments[name] = Template("\n".join(lines))
+            name, lines = line[1:-1], []
+        else:
+            lines.append(line)
+    if name:
+        fragments[name] = Template("\n".join(lines))
+    return fragments
+
+
+def load_templates():
+    """
+    Compile every email template, once per process.
+
+    Returns:
+        dict: {"html": {...}, "text": {...}} with the page templates
+        ("full", "diff", "empty") and fragments ("item", "more", "added",
+        "removed") for each format
+    """
+    if not _templates:
+        for kind, extension in (("html", "html"), ("text", "txt")):
+            compiled = _parse_fragments(_read(f"fragments.{extension}"))
+            for page in ("full", "diff", "empty"):
+                compiled[page] = Template(_read(f"email_{page}.{extension}"))
+            _templates[kind] = compiled
+    return _templates
+
+
+class EmailRenderer:
+    """Renders (html, text) email bodies with a content-hash keyed cache."""
+
+    def __init__(self, preview_size=15, cache_size=64):
+        """
+        Args:
+            preview_size (int): Items listed per section before the "more" row
+            cache_size (int): Rendered bodies kept in memory
+        """
+        self.preview_size = preview_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def content_key(self, data_list, diff=None):
+        """Stable hash of everything that affects the rendered body."""
+        payload = json.dumps([self.preview_size, data_list, diff], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def render(self, data_list, diff=None, timestamp=None):
+        """
+        Render the update email.
+
+        Args:
+            data_list (list): Scraped destinations
+            diff (tuple): Optional (added, removed) lists; when given the
+                email shows the changes instead of the full list
+            timestamp (str): Time shown in the heading, defaults to now
+
+        Returns:
+            tuple: (html, text) bodies
+        """
+        if diff is not None:
+            diff = [list(diff[0]), list(diff[1])]
+        key = self.content_key(data_list, diff)
+
+        bodies = self._cache.get(key)
+        if bodies is None:
+            self.misses += 1
+            bodies = (self._render("html", data_list, diff), self._render("text", data_list, diff))
+            self._cache[key] = bodies
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return tuple(body.replace(_TIMESTAMP_MARK, timestamp) for body in bodies)
+
+    def _render(self, kind, data_list, diff):
+        templates = load_templates()[kind]
+        escape = html.escape if kind == "html" else str
+
+        def items(values):
+            rows = [templates["item"].substitute(item=escape(str(value))) for value in values[:self.preview_size]]
+            if len(values) > self.preview_size:
+                rows.append(templates["more"].substitute(count=len(values) - self.preview_size))
+            return "\n".join(rows)
+
+        if not data_list:
+            return templates["empty"].substitute(timestamp=_TIMESTAMP_MARK)
+
+        if diff is None:
+            return templates["full"].substitute(
+                timestamp=_TIMESTAMP_MARK, total=len(data_list), items=items(data_list))
+
+        added, removed = diff
+        sections = []
+        if added:
+            sections.append(templates["added"].substitute(count=len(added), items=items(added)))
+        if removed:
+            sections.append(templates["removed"].substitute(count=len(removed), items=items(removed)))
+        return templates["diff"].substitute(
+            timestamp=_TIMESTAMP_MARK, total=len(data_list), added_count=len(added),
+            removed_count=len(removed), sections="\n".join(sections))
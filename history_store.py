@@ -0,0 +1,255 @@
+"""
+Destination History Store
+=========================
+Append-only SQLite history of every scraped destination list, for cheap
+questions such as "which destinations appeared more than 3 times this
+month" without loading the whole history.
+
+Schema:
+    runs          one row per scrape (target, timestamp, item count)
+    destinations  one row per normalized key (latest display name)
+    sightings     one row per destination per run, clustered by run, with
+                  the price/date seen and whether it was new since the
+                  previous run of the same target
+
+runs(seen_at) and sightings(destination_id, run_id) are indexed, so time
+range and per-destination queries only touch the matching rows. Query
+results are streamed from the cursor.
+
+Usage:
+    python history_store.py frequent --since 2026-10-01 --min 3
+    python history_store.py timeline "paris"
+    python history_store.py runs --limit 10
+"""
+
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    item_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_seen_at ON runs (seen_at);
+CREATE INDEX IF NOT EXISTS runs_target_seen_at ON runs (target, seen_at);
+
+CREATE TABLE IF NOT EXISTS destinations (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sightings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    destination_id INTEGER NOT NULL REFERENCES destinations (id),
+    is_new INTEGER NOT NULL,
+    price REAL,
+    date TEXT,
+    PRIMARY KEY (run_id, destination_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sightings_destination ON sightings (destination_id, run_id);
+"""
+
+
+def _timestamp(value):
+    """ISO timestamp text for a datetime, date string or None (now)."""
+    if value is None:
+        return datetime.now().isoformat(timespec="seconds")
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return str(value)
+
+
+class HistoryStore:
+    """SQLite-backed, append-only history of scraped destinations."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Location of the SQLite database file
+        """
+        self.path = path
+        self._connection = None
+
+    def connect(self):
+        """Open the database (once) and make sure the schema exists."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def append(self, records, target="default", seen_at=None):
+        """
+        Record one scrape.
+
+        Args:
+            records (list): Destination records from the cycle
+            target (str): Name of the watched page
+            seen_at (datetime | str): Scrape time, defaults to now
+
+        Returns:
+            int: The new run id
+        """
+        connection = self.connect()
+        with connection:
+            previous = connection.execute(
+                "SELECT id FROM runs WHERE target = ? ORDER BY id DESC LIMIT 1", (target,)
+            ).fetchone()
+            previous_ids = set()
+            if previous:
+                previous_ids = {row[0] for row in connection.execute(
+                    "SELECT destination_id FROM sightings WHERE run_id = ?", (previous[0],)
+                )}
+
+            run_id = connection.execute(
+                "INSERT INTO runs (target, seen_at, item_count) VALUES (?, ?, ?)",
+                (target, _timestamp(seen_at), len(records)),
+            ).lastrowid
+
+            rows = {}
+            for record in records:
+                connection.execute(
+                    "INSERT INTO destinations (key, name) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET name = excluded.name",
+                    (record.key, record.name),
+                )
+                destination_id = connection.execute(
+                    "SELECT id FROM destinations WHERE key = ?", (record.key,)
+                ).fetchone()[0]
+                rows[destination_id] = (run_id, destination_id, int(destination_id not in previous_ids),
+                                        record.price, record.date)
+
+            connection.executemany(
+                "INSERT INTO sightings (run_id, destination_id, is_new, price, date) VALUES (?, ?, ?, ?, ?)",
+                rows.values(),
+            )
+        return run_id
+
+    def frequent(self, since=None, until=None, min_appearances=1, target=None):
+        """
+        Destinations that appeared at least min_appearances times in a window.
+
+        An appearance is a run where the destination was listed but was
+        missing from the previous run of the same target.
+
+        Args:
+            since (str): Inclusive ISO start of the window (None for the beginning)
+            until (str): Exclusive ISO end of the window (None for now)
+            min_appearances (int): Minimum number of appearances
+            target (str): Restrict to one watched page
+
+        Yields:
+            tuple: (key, name, appearances, runs_listed, min_price)
+        """
+        query = """
+            SELECT d.key, d.name, SUM(s.is_new), COUNT(*), MIN(s.price)
+            FROM runs r
+            JOIN sightings s ON s.run_id = r.id
+            JOIN destinations d ON d.id = s.destination_id
+            WHERE r.seen_at >= ? AND r.seen_at < ?
+        """
+        params = [since or "", until or "9999"]
+        if target:
+            query += " AND r.target = ?"
+            params.append(target)
+        query += " GROUP BY s.destination_id HAVING SUM(s.is_new) >= ? ORDER BY SUM(s.is_new) DESC, d.key"
+        params.append(min_appearances)
+        yield from self.connect().execute(query, params)
+
+    def timeline(self, key, since=None, until=None):
+        """
+        Every run that listed a destination, oldest first.
+
+        Args:
+            key (str): Normalized destination key
+            since (str): Inclusive ISO start (None for the beginning)
+            until (str): Exclusive ISO end (None for now)
+
+        Yields:
+            tuple: (seen_at, target, is_new, price, date)
+        """
+        yield from self.connect().execute(
+            """
+            SELECT r.seen_at, r.target, s.is_new, s.price, s.date
+            FROM destinations d
+            JOIN sightings s ON s.destination_id = d.id
+            JOIN runs r ON r.id = s.run_id
+            WHERE d.key = ? AND r.seen_at >= ? AND r.seen_at < ?
+            ORDER BY s.run_id
+            """,
+            (key, since or "", until or "9999"),
+        )
+
+    def runs(self, limit=20):
+        """
+        The most recent runs, newest first.
+
+        Yields:
+            tuple: (run_id, target, seen_at, item_count)
+        """
+        yield from self.connect().execute(
+            "SELECT id, target, seen_at, item_count FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+        )
+
+
+def main():
+    """Query the history from the command line."""
+    from config import get_config
+    from destinations import destination_key
+
+    parser = argparse.ArgumentParser(description="Query the destination history")
+    parser.add_argument("--db", help="History database (defaults to BOT_STATE_DIR/history.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    frequent = commands.add_parser("frequent", help="Destinations that appeared at least --min times")
+    frequent.add_argument("--since", help="Start date, e.g. 2026-10-01 (default: first day of this month)")
+    frequent.add_argument("--until", help="End date, exclusive")
+    frequent.add_argument("--min", type=int, default=1, dest="min_appearances")
+    frequent.add_argument("--target")
+
+    timeline = commands.add_parser("timeline", help="Every run that listed a destination")
+    timeline.add_argument("name", help="Destination name (normalized before lookup)")
+    timeline.add_argument("--since")
+    timeline.add_argument("--until")
+
+    runs = commands.add_parser("runs", help="Most recent runs")
+    runs.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    store = HistoryStore(args.db or os.path.join(get_config().bot_state_dir, "history.sqlite3"))
+    try:
+        if args.command == "frequent":
+            since = args.since or datetime.now().strftime("%Y-%m-01")
+            print(f"📈 Destinations with at least {args.min_appearances} appearance(s) since {since}:")
+            for key, name, appearances, listed, min_price in store.frequent(
+                since, args.until, args.min_appearances, args.target
+            ):
+                price = f", from {min_price:g}" if min_price is not None else ""
+                print(f"   {appearances:>4}x  {name}  (listed in {listed} runs{price})")
+        elif args.command == "timeline":
+            for seen_at, target, is_new, price, date in store.timeline(destination_key(args.name), args.since, args.until):
+                details = ", ".join(part for part in (f"price {price:g}" if price is not None else "",
+                                                      f"date {date}" if date else "") if part)
+                print(f"   {seen_at}  [{target}]  {'🆕' if is_new else '  '} {details}")
+        else:
+            for run_id, target, seen_at, item_count in store.runs(args.limit):
+                print(f"   #{run_id:<6} {seen_at}  [{target}]  {item_count} destinations")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
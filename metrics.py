@@ -0,0 +1,211 @@
+"""
+Run Metrics for WhatsApp Bot
+============================
+Lightweight per-stage tracing for bot cycles.
+
+Each stage records its duration plus optional byte and item counts. When
+a run finishes the spans are appended to a JSON-lines file
+(METRICS_PATH) and, if METRICS_PROM_PATH is set, written as a Prometheus
+textfile for node_exporter's textfile collector.
+
+Usage:
+    from metrics import tracer
+
+    tracer.start_run()
+    with tracer.stage("extraction") as span:
+        items = extract()
+        span["items"] = len(items)
+    tracer.finish_run(success=True)
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from atomic_file import atomic_write_text
+from config import get_config
+
+
+class Tracer:
+    """Collects timed spans for one run at a time and exports them."""
+
+    def __init__(self, jsonl_path=None, prom_path=None, from_config=False):
+        """
+        Args:
+            jsonl_path (str): JSON-lines file to append spans to (None disables)
+            prom_path (str): Prometheus textfile to overwrite per run (None disables)
+            from_config (bool): Take both paths from METRICS_PATH and
+                METRICS_PROM_PATH when the first run starts
+        """
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self._from_config = from_config
+        self.run_id = None
+        self.spans = []
+        self.last_run = None
+        self._run_start = None
+        self._lock = threading.Lock()
+
+    def start_run(self):
+        """Begin a new run, discarding spans from any unfinished one."""
+        if self._from_config:
+            config = get_config()
+            self.jsonl_path = config.metrics_path or None
+            self.prom_path = config.metrics_prom_path or None
+            self._from_config = False
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.spans = []
+            self._run_start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """
+        Time a block of code as a named stage.
+
+        Yields a dict the caller may fill with extra fields such as
+        "bytes" or "items". The span is recorded even if the block raises.
+
+        Args:
+            name (str): Stage name
+            **fields: Initial span fields
+        """
+        span = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception:
+            span["error"] = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **span)
+
+    def record(self, name, duration=None, **fields):
+        """
+        Record a span directly (for values measured elsewhere).
+
+        Args:
+            name (str): Stage name
+            duration (float): Duration in seconds, if any
+            **fields: Extra span fields
+        """
+        span = {"stage": name}
+        if duration is not None:
+            span["duration_s"] = round(duration, 6)
+        span.update(fields)
+        with self._lock:
+            self.spans.append(span)
+
+    def extend(self, spans):
+        """
+        Add spans recorded by another tracer, e.g. in a worker process.
+
+        Args:
+            spans (list): Span dicts as produced by record()
+        """
+        with self._lock:
+            self.spans.extend(dict(span) for span in spans)
+
+    def finish_run(self, **fields):
+        """
+        Close the current run and export its spans.
+
+        Args:
+            **fields: Run-level fields (e.g. success, outcome)
+
+        Returns:
+            dict: Summary of the run including all spans
+        """
+        with self._lock:
+            total = time.perf_counter() - self._run_start if self._run_start else None
+            summary = {
+                "run_id": self.run_id,
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "duration_s": round(total, 6) if total is not None else None,
+                "spans": list(self.spans),
+            }
+            summary.update(fields)
+            self.last_run = summary
+            self._run_start = None
+
+        try:
+            self._write_jsonl(summary)
+            self._write_prometheus(summary)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics: {e}")
+
+        timings = ", ".join(
+            f"{span['stage']} {span['duration_s']:.2f}s" for span in summary["spans"] if "duration_s" in span
+        )
+        if timings:
+            print(f"⏱️ Stage timings: {timings}")
+        return summary
+
+    def _write_jsonl(self, summary):
+        """Append one line per span and one line for the run."""
+        if not self.jsonl_path:
+            return
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            for span in summary["spans"]:
+                f.write(json.dumps({"run_id": summary["run_id"], "at": summary["at"], **span}, ensure_ascii=False) + "\n")
+            run = {key: value for key, value in summary.items() if key != "spans"}
+            f.write(json.dumps({"stage": "run", **run}, ensure_ascii=False) + "\n")
+
+    def _write_prometheus(self, summary):
+        """Overwrite the textfile with gauges for the latest run."""
+        if not self.prom_path:
+            return
+
+        # Stages may repeat within a run (e.g. several targets), so sum per stage
+        totals = {"duration_s": {}, "bytes": {}, "items": {}}
+        for span in summary["spans"]:
+            label = span["stage"].replace("\\", "_").replace('"', "_")
+            for field, values in totals.items():
+                if isinstance(span.get(field), (int, float)) and not isinstance(span.get(field), bool):
+                    values[label] = values.get(label, 0) + span[field]
+
+        lines = []
+        for field, metric, help_text in (
+            ("duration_s", "tustus_bot_stage_duration_seconds", "Time spent in each stage in the last run."),
+            ("bytes", "tustus_bot_stage_bytes", "Bytes handled by each stage in the last run."),
+            ("items", "tustus_bot_stage_items", "Items handled by each stage in the last run."),
+        ):
+            if totals[field]:
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} gauge")
+                lines.extend(f'{metric}{{stage="{label}"}} {round(value, 6)}' for label, value in totals[field].items())
+
+        lines += [
+            "# HELP tustus_bot_run_duration_seconds Duration of the last run.",
+            "# TYPE tustus_bot_run_duration_seconds gauge",
+            f"tustus_bot_run_duration_seconds {summary['duration_s'] or 0}",
+            "# HELP tustus_bot_last_run_timestamp_seconds Unix time the last run finished.",
+            "# TYPE tustus_bot_last_run_timestamp_seconds gauge",
+            f"tustus_bot_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        resources = [span for span in summary["spans"] if span["stage"] == "browser_resources"]
+        if resources:
+            lines += [
+                "# HELP tustus_bot_browser_peak_rss_bytes Peak RSS of the chromedriver/Chrome tree in the last run.",
+                "# TYPE tustus_bot_browser_peak_rss_bytes gauge",
+                f"tustus_bot_browser_peak_rss_bytes {max(span['peak_rss_bytes'] for span in resources)}",
+                "# HELP tustus_bot_browser_cpu_seconds CPU time of the chromedriver/Chrome tree in the last run.",
+                "# TYPE tustus_bot_browser_cpu_seconds gauge",
+                f"tustus_bot_browser_cpu_seconds {round(sum(span['cpu_s'] for span in resources), 3)}",
+            ]
+        if "success" in summary:
+            lines += [
+                "# HELP tustus_bot_last_run_success Whether the last run succeeded.",
+                "# TYPE tustus_bot_last_run_success gauge",
+                f"tustus_bot_last_run_success {int(bool(summary['success']))}",
+            ]
+
+        # node_exporter may read at any moment, so replace the file atomically
+        atomic_write_text(self.prom_path, "\n".join(lines) + "\n")
+
+
+# Shared tracer used by the bot and scheduler
+tracer = Tracer(from_config=True)
@@ -0,0 +1,283 @@
+"""
+Multi-Target Scraping Engine
+============================
+Watches several Tustus search pages at once and sends each subscriber a
+single digest of the changes on the pages they follow.
+
+Targets are read from a JSON file (WATCH_TARGETS_FILE, default
+targets.json):
+
+    {
+        "targets": [
+            {
+                "name": "arkia-home",
+                "url": "https://www.tustus.co.il/Arkia/Home",
+                "render": "auto",
+                "subscribers": ["me@example.com"]
+            }
+        ]
+    }
+
+"render" is "auto" (HTTP first, browser fallback), "http" or "browser".
+Targets without subscribers report to TO_EMAIL; a target left with nobody
+to report to is skipped. Names may only use letters, digits, ".", "_" and
+"-", since they name the target's snapshot file.
+
+Static pages are fetched concurrently, limited per host; targets that need
+JavaScript share a bounded pool of Chrome sessions. Subscriber digests are
+queued and delivered together through the bot's DeliveryQueue.
+
+Usage:
+    python multi_target.py
+"""
+
+import asyncio
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+from config import get_config
+from destinations import names
+from driver_pool import DriverPool
+from metrics import tracer
+from snapshot_store import SnapshotStore
+from whatsapp_bot import WhatsAppBot, build_chrome_driver, fetch_static_destinations
+
+
+# Target names become file names under BOT_STATE_DIR/targets
+_TARGET_NAME = re.compile(r"[\w-][\w.-]*")
+
+
+class WatchTarget:
+    """A single page to watch and the subscribers interested in it."""
+
+    def __init__(self, name, url, render="auto", subscribers=None):
+        if not _TARGET_NAME.fullmatch(name):
+            raise ValueError(f"Invalid target name {name!r}: use letters, digits, '.', '_' and '-'")
+        self.name = name
+        self.url = url
+        self.render = render
+        self.subscribers = subscribers or list(get_config().to_emails)
+
+    @property
+    def host(self):
+        return urlparse(self.url).netloc.lower()
+
+
+def load_targets(path=None):
+    """
+    Load watch targets from a JSON file.
+
+    Args:
+        path (str): Targets file, either {"targets": [...]} or a bare list;
+            defaults to WATCH_TARGETS_FILE
+
+    Returns:
+        list: WatchTarget objects
+    """
+    path = path or get_config().watch_targets_file
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    entries = data.get("targets", []) if isinstance(data, dict) else data
+    targets = []
+    for index, entry in enumerate(entries):
+        target = WatchTarget(
+            name=entry.get("name") or f"target-{index + 1}",
+            url=entry["url"],
+            render=entry.get("render", "auto").lower(),
+            subscribers=entry.get("subscribers"),
+        )
+        if not target.subscribers:
+            print(f"⚠️ [{target.name}] No subscribers and no TO_EMAIL, skipping target")
+            continue
+        targets.append(target)
+    return targets
+
+
+class MultiTargetEngine:
+    """Asyncio engine that scrapes many targets concurrently."""
+
+    def __init__(self, bot=None, host_concurrency=None, browser_contexts=None):
+        """
+        Args:
+            bot (WhatsAppBot): Bot used for scraping and email delivery; one
+                with a private driver pool is created when omitted
+            host_concurrency (int): Maximum simultaneous requests per host,
+                defaults to TARGET_HOST_CONCURRENCY
+            browser_contexts (int): Maximum simultaneous Chrome sessions,
+                defaults to BROWSER_CONTEXTS
+        """
+        self.config = config = bot.config if bot is not None else get_config()
+        self.host_concurrency = max(1, host_concurrency or config.target_host_concurrency)
+        self.browser_contexts = max(1, browser_contexts or config.browser_contexts)
+        self.driver_pool = None
+        if bot is None:
+            self.driver_pool = DriverPool(factory=lambda: build_chrome_driver(config), size=self.browser_contexts)
+            bot = WhatsAppBot(driver_pool=self.driver_pool, config=config)
+        self.bot = bot
+
+        # Created by run() for each event loop
+        self._host_limits = {}
+        self._browser_limit = None
+
+    async def scrape_target(self, target):
+        """
+        Scrape one target, only using a browser when it needs JavaScript.
+
+        Args:
+            target (WatchTarget): Page to scrape
+
+        Returns:
+            list: Destination records or None if scraping failed
+        """
+        async with self._host_limits[target.host]:
+            items = None
+            if target.render in ("auto", "http"):
+                items = await asyncio.to_thread(fetch_static_destinations, target.url, self.config)
+                if items or target.render == "http":
+                    return items
+
+            async with self._browser_limit:
+                print(f"🌐 [{target.name}] Rendering with Chrome")
+                return await asyncio.to_thread(self.bot.scrape_with_browser, target.url)
+
+    async def run(self, targets):
+        """
+        Scrape all targets concurrently.
+
+        Args:
+            targets (list): WatchTarget objects
+
+        Returns:
+            dict: Target name -> destination records (None if the scrape failed)
+        """
+        # Semaphores bind to the loop they are first contended on, and every
+        # run_cycle() starts a new loop, so they are never reused across runs
+        self._host_limits = {target.host: asyncio.Semaphore(self.host_concurrency) for target in targets}
+        self._browser_limit = asyncio.Semaphore(self.browser_contexts)
+        results = await asyncio.gather(
+            *(self.scrape_target(target) for target in targets),
+            return_exceptions=True,
+        )
+
+        scraped = {}
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                print(f"❌ [{target.name}] Scrape failed: {result}")
+                result = None
+            scraped[target.name] = result
+        return scraped
+
+    @staticmethod
+    def merge_by_subscriber(targets, changes):
+        """
+        Combine per-target changes into one digest per subscriber.
+
+        Args:
+            targets (list): WatchTarget objects
+            changes (dict): Target name -> (current, added, removed)
+
+        Returns:
+            dict: Subscriber email -> (current, added, removed) with items
+            prefixed by the target name
+        """
+        digests = {}
+        for target in targets:
+            if target.name not in changes:
+                continue
+            current, added, removed = changes[target.name]
+            for subscriber in target.subscribers:
+                digest = digests.setdefault(subscriber, ([], [], []))
+                digest[0].extend(f"{target.name}: {item}" for item in current)
+                digest[1].extend(f"{target.name}: {item}" for item in added)
+                digest[2].extend(f"{target.name}: {item}" for item in removed)
+        return digests
+
+    def run_cycle(self, targets):
+        """
+        Scrape every target, diff against per-target snapshots and notify subscribers.
+
+        Args:
+            targets (list): WatchTarget objects
+
+        Returns:
+            bool: True if every digest was delivered
+        """
+        tracer.start_run()
+        try:
+            success = self._run_cycle(targets)
+        except Exception:
+            tracer.finish_run(success=False, targets=len(targets))
+            raise
+        tracer.finish_run(success=success, targets=len(targets))
+        return success
+
+    def _run_cycle(self, targets):
+        """Scrape, diff and notify; run_cycle() wraps this in a traced run."""
+        scraped = asyncio.run(self.run(targets))
+
+        changes = {}
+        stores = {}
+        for target in targets:
+            records = scraped.get(target.name)
+            if not records:
+                print(f"⚠️ [{target.name}] No destinations, keeping last snapshot")
+                continue
+            self.bot._record_history(records, target=target.name)
+            items = names(records)
+            store = SnapshotStore(os.path.join(self.config.bot_state_dir, "targets", f"{target.name}.json"))
+            added, removed = store.diff(items)
+            print(f"📊 [{target.name}] {len(items)} destinations, {len(added)} added, {len(removed)} removed")
+            if added or removed:
+                changes[target.name] = (items, added, removed)
+                stores[target.name] = store
+
+        # Queue every digest, then deliver them in one batched flush
+        queued = {}
+        for subscriber, (current, added, removed) in self.merge_by_subscriber(targets, changes).items():
+            params = self.bot.build_email(current, diff=(added, removed), to=subscriber)
+            # Snapshots of undelivered targets don't advance, so the next digest
+            # repeats their changes and replaces this one in the outbox
+            queued[subscriber] = self.bot.delivery.enqueue(params, key=f"digest:{subscriber}")
+
+        # Flush even without digests so earlier failures in the outbox are retried
+        sent, failed = self.bot.delivery.flush()
+        delivered = {subscriber for subscriber, message in queued.items()
+                     if any(item is message for item in sent)}
+        success = len(delivered) == len(queued)
+
+        # Advance a target's snapshot only once all of its subscribers got the change
+        for target in targets:
+            if target.name in stores and target.subscribers and all(s in delivered for s in target.subscribers):
+                current, added, removed = changes[target.name]
+                stores[target.name].save(current, added, removed)
+        return success
+
+    def close(self):
+        """Shut down the engine's private Chrome sessions."""
+        if self.driver_pool is not None:
+            self.driver_pool.close()
+
+
+def main():
+    """Run one multi-target cycle."""
+    try:
+        targets = load_targets()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Could not load watch targets from {get_config().watch_targets_file}: {e}")
+        return
+
+    print(f"🎯 Watching {len(targets)} targets")
+    engine = MultiTargetEngine()
+    try:
+        engine.run_cycle(targets)
+    except KeyboardInterrupt:
+        print("\n🛑 Engine stopped by user.")
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Process Tree Helpers
+====================
+Small /proc based helpers for inspecting and killing a process together
+with everything it spawned (chromedriver, Chrome and its renderers).
+
+Linux only; on other platforms the inspection helpers return empty
+results and kill_tree() falls back to killing the root process.
+"""
+
+import os
+import signal
+import threading
+
+_PROC = "/proc"
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_stat(pid):
+    """Fields of /proc/<pid>/stat after the command name, or None."""
+    try:
+        with open(f"{_PROC}/{pid}/stat", "r") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces, so split after its closing paren
+    return data[data.rfind(")") + 2:].split()
+
+
+def descendant_pids(root_pid):
+    """
+    All live descendants of a process.
+
+    Args:
+        root_pid (int): Process to start from
+
+    Returns:
+        list: PIDs of children, grandchildren, ... (not including root_pid)
+    """
+    if not os.path.isdir(_PROC):
+        return []
+
+    children = {}
+    for entry in os.listdir(_PROC):
+        if not entry.isdigit():
+            continue
+        fields = _read_stat(entry)
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+
+    found = []
+    stack = [root_pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def pid_alive(pid):
+    """Whether a process with this PID exists (possibly owned by another user)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_rss_bytes(pid):
+    """Resident set size of one process in bytes (0 if it is gone)."""
+    try:
+        with open(f"{_PROC}/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_cpu_seconds(pid):
+    """User + system CPU time of one process in seconds (0 if it is gone)."""
+    fields = _read_stat(pid)
+    if not fields:
+        return 0.0
+    # utime and stime are fields 14 and 15 of stat, i.e. 11 and 12 after the name
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+
+
+def tree_rss_bytes(root_pid):
+    """Combined RSS of a process and all its descendants."""
+    return sum(process_rss_bytes(pid) for pid in [root_pid] + descendant_pids(root_pid))
+
+
+def kill_tree(root_pid, sig=signal.SIGKILL):
+    """
+    Kill a process and every descendant.
+
+    Descendants are collected before anything is killed so that orphans
+    re-parented to init are not missed.
+
+    Args:
+        root_pid (int): Root of the tree
+        sig (int): Signal to send
+
+    Returns:
+        int: Number of processes signalled
+    """
+    pids = descendant_pids(root_pid) + [root_pid]
+    signalled = 0
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+            signalled += 1
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    # The worker runs in its own session; sweep the group for stragglers
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(root_pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+    return signalled
+
+
+class TreeSampler:
+    """
+    Background thread tracking the peak RSS and CPU time of a process tree.
+
+    CPU time is counted from start(), so a long-lived (pooled) browser is
+    only charged for the work done while sampling. Processes that exit
+    between two samples lose their last slice of CPU time.
+    """
+
+    def __init__(self, root_pid, interval=0.2):
+        """
+        Args:
+            root_pid (int): Root of the tree (e.g. chromedriver)
+            interval (float): Seconds between samples
+        """
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peak_rss = 0
+        self.max_processes = 0
+        self._baseline = {}
+        self._cpu = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        pids = [self.root_pid] + descendant_pids(self.root_pid)
+        rss = 0
+        for pid in pids:
+            rss += process_rss_bytes(pid)
+            self._cpu[pid] = max(self._cpu.get(pid, 0.0), process_cpu_seconds(pid))
+        self.peak_rss = max(self.peak_rss, rss)
+        self.max_processes = max(self.max_processes, len(pids))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Take the CPU baseline and begin sampling."""
+        self._sample()
+        self._baseline = dict(self._cpu)
+        self._thread = threading.Thread(target=self._run, name="tree-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Take a final sample and stop the thread.
+
+        Returns:
+            dict: peak_rss_bytes, cpu_s and processes for the sampled window
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        cpu = sum(max(0.0, seconds - self._baseline.get(pid, 0.0)) for pid, seconds in self._cpu.items())
+        return {"peak_rss_bytes": self.peak_rss, "cpu_s": round(cpu, 3), "processes": self.max_processes}
@@ -0,0 +1,221 @@
+"""
+Single-Flight Run Lock
+======================
+Keeps overlapping invocations (cron, a manual run, the local scheduler)
+from scraping and emailing at the same time.
+
+RunLock is a lock file created with O_EXCL that records who holds it. A
+lock is considered stale, and is taken over, once it is older than the
+stale timeout or its owner process on this host has died. Takeovers are
+serialized by an OS lock on a guard file and re-check the owner inside it,
+so two waiters can never both remove a lock and both run.
+
+ResultCache keeps the last scrape result on disk for a short TTL. A cycle
+that waited for the lock, or starts right after another one, reuses the
+fresh result instead of scraping again; its diff against the snapshot the
+first cycle saved is then empty, so no duplicate email goes out.
+"""
+
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from atomic_file import atomic_write_json
+from destinations import Destination
+from process_tree import pid_alive
+
+
+class RunLock:
+    """Cross-process lock file with a stale-lock timeout."""
+
+    def __init__(self, path, stale_after=900.0, poll_interval=1.0):
+        """
+        Args:
+            path (str): Location of the lock file
+            stale_after (float): Seconds after which a held lock is taken over
+            poll_interval (float): Seconds between attempts while waiting
+        """
+        self.path = path
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.held = False
+
+    def _owner(self):
+        """Contents of the lock file, or None if there is no readable lock."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Half-written by a holder that died mid-write; age decides
+            return {}
+
+    def _is_stale(self, owner):
+        try:
+            age = time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if age > self.stale_after:
+            return True
+        if owner.get("host") == socket.gethostname() and owner.get("pid"):
+            return not pid_alive(owner["pid"])
+        return False
+
+    @contextmanager
+    def _takeover_guard(self):
+        """Hold an exclusive OS lock on the guard file next to the lock."""
+        with open(f"{self.path}.guard", "a+b") as guard:
+            if fcntl is not None:
+                fcntl.flock(guard.fileno(), fcntl.LOCK_EX)
+            else:
+                guard.seek(0)
+                msvcrt.locking(guard.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(guard.fileno(), fcntl.LOCK_UN)
+                else:
+                    guard.seek(0)
+                    msvcrt.locking(guard.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _remove_if_stale(self):
+        """
+        Remove the lock if it is (still) stale.
+
+        The owner is re-read under the guard: a waiter that lost the race
+        sees the new holder's fresh lock and leaves it alone.
+
+        Returns:
+            bool: True if a stale lock was removed
+        """
+        with self._takeover_guard():
+            owner = self._owner()
+            if owner is None or not self._is_stale(owner):
+                return False
+            print(f"🔓 Taking over stale run lock (pid {owner.get('pid', '?')} on {owner.get('host', '?')})")
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return True
+
+    def _try_create(self):
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "host": socket.gethostname(), "started": time.time()}, f)
+        return True
+
+    def acquire(self, wait=0.0):
+        """
+        Take the lock, waiting up to wait seconds for the current holder.
+
+        Args:
+            wait (float): Maximum seconds to wait (0 tries once)
+
+        Returns:
+            bool: True if the lock is now held by this process
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        deadline = time.monotonic() + wait
+        announced = False
+        while True:
+            if self._try_create():
+                self.held = True
+                return True
+
+            owner = self._owner()
+            if owner is not None and self._is_stale(owner) and self._remove_if_stale():
+                continue
+
+            if time.monotonic() >= deadline:
+                return False
+            if not announced:
+                print(f"⏳ Another bot cycle is running (pid {(owner or {}).get('pid', '?')}), waiting up to {wait:.0f}s")
+                announced = True
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        """Remove the lock file if this process holds it."""
+        if not self.held:
+            return
+        self.held = False
+        owner = self._owner()
+        if owner and owner.get("pid") == os.getpid() and owner.get("host") == socket.gethostname():
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class ResultCache:
+    """Short-lived on-disk cache of the last scrape result."""
+
+    def __init__(self, path, ttl=300.0):
+        """
+        Args:
+            path (str): Location of the cache JSON file
+            ttl (float): Seconds a result stays fresh (0 disables the cache)
+        """
+        self.path = path
+        self.ttl = ttl
+
+        # Statistics
+        self.hits = 0
+
+    def get(self, url):
+        """
+        The cached records for url if they are still fresh.
+
+        Args:
+            url (str): Target URL the result was scraped from
+
+        Returns:
+            list: Destination records, or None on a miss
+        """
+        if not self.ttl:
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read result cache {self.path}: {e}")
+            return None
+
+        age = time.time() - entry.get("scraped_at", 0)
+        if entry.get("url") != url or not 0 <= age <= self.ttl:
+            return None
+        self.hits += 1
+        print(f"♻️ Reusing the scrape from {age:.0f}s ago ({len(entry['records'])} destinations)")
+        return [Destination(**record) for record in entry["records"]]
+
+    def put(self, url, records):
+        """
+        Store a fresh scrape result.
+
+        Args:
+            url (str): Target URL the result was scraped from
+            records (list): Destination records
+        """
+        if not self.ttl:
+            return
+        entry = {"url": url, "scraped_at": time.time(), "records": [asdict(record) for record in records]}
+        atomic_write_json(self.path, entry, ensure_ascii=False, separators=(",", ":"))
@@ -2,19 +2,30 @@
 Scheduler for WhatsApp Bot
 =========================
 Alternative scheduling solution using Python's schedule library.
-Runs the bot 5 times daily at specified intervals.
+Runs the bot 5 times daily at specified intervals, or continuously in
+daemon mode with an adaptive poll interval.
 
 Usage:
-    python scheduler.py
+    python scheduler.py            # fixed daily schedule
+    python scheduler.py --daemon   # adaptive polling, honours QUIET_HOURS
+    python scheduler.py --serve    # also serve the latest results over HTTP (API_HOST/API_PORT)
 
 Note: This is an alternative to using Windows Task Scheduler or cron jobs.
 """
 
 import schedule
-import time
+import argparse
+import signal
+import threading
 import logging
-from datetime import datetime
-from whatsapp_bot import WhatsAppBot
+import os
+from datetime import datetime, timedelta
+from config import get_config
+from driver_pool import DriverPool
+from metrics import tracer
+from scrape_worker import ScrapeSupervisor
+from snapshot_store import SnapshotStore
+from whatsapp_bot import WhatsAppBot, build_chrome_driver
 
 # Configure logging
 logging.basicConfig(
@@ -28,12 +39,106 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+class AdaptivePoller:
+    """Poll interval that tightens after a change and backs off while nothing changes."""
+    
+    def __init__(self, min_interval=600, max_interval=7200, backoff=1.5):
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.backoff = max(1.0, backoff)
+        self.interval = self.min_interval
+    
+    def next_interval(self, changed):
+        """
+        Compute the wait before the next run.
+        
+        Args:
+            changed (bool): Whether the last run saw destination changes
+            
+        Returns:
+            float: Seconds to wait
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+
+def parse_quiet_hours(value):
+    """
+    Parse a "HH:MM-HH:MM" window.
+    
+    Returns:
+        tuple: (start, end) as datetime.time, or None if unset/invalid
+    """
+    if not value:
+        return None
+    try:
+        start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in value.split("-"))
+    except ValueError:
+        logger.warning(f"⚠️ Ignoring invalid QUIET_HOURS value: {value!r}")
+        return None
+    return start, end
+
+
+def quiet_hours_end(now, window):
+    """
+    When the quiet window containing now ends.
+    
+    Args:
+        now (datetime): Current local time
+        window (tuple): (start, end) times; may wrap past midnight
+        
+    Returns:
+        datetime: End of the current quiet window, or None if now is outside it
+    """
+    if not window:
+        return None
+    start, end = window
+    current = now.time()
+    
+    if start <= end:
+        inside = start <= current < end
+    else:
+        inside = current >= start or current < end
+    if not inside:
+        return None
+    
+    end_at = now.replace(hour=end.hour, minute=end.minute, second=0, microsecond=0)
+    if end_at <= now:
+        end_at += timedelta(days=1)
+    return end_at
+
+
 class BotScheduler:
     """Scheduler class to manage automated bot runs."""
     
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Args:
+            config (BotConfig): Settings to use, defaults to get_config()
+        """
+        self.config = config = config or get_config()
         self.bot = None
         self.run_count = 0
+        self.api_cache = None
+        self._stop = threading.Event()
+        # Warm Chrome sessions shared by every scheduled run
+        self.driver_pool = DriverPool(
+            factory=lambda: build_chrome_driver(config),
+            size=config.driver_pool_size,
+            max_uses=config.driver_max_uses,
+        )
+        # With SCRAPE_ISOLATION=process every scrape runs in a supervised worker
+        # (the warm pool is then unused, since drivers cannot cross processes)
+        self.scrape_supervisor = None
+        if config.scrape_isolation == "process":
+            self.scrape_supervisor = ScrapeSupervisor(
+                deadline=config.scrape_deadline,
+                rss_limit_mb=config.scrape_rss_limit_mb,
+                retries=config.scrape_worker_retries,
+            )
     
     def run_scheduled_task(self):
         """Execute a scheduled bot run."""
@@ -41,8 +146,9 @@ class BotScheduler:
         logger.info(f"🚀 Starting scheduled run #{self.run_count}")
         
         try:
-            # Create a new bot instance for each run
-            self.bot = WhatsAppBot()
+            # Create a new bot instance for each run, reusing warm drivers
+            self.bot = WhatsAppBot(driver_pool=self.driver_pool, scrape_supervisor=self.scrape_supervisor,
+                                   config=self.config)
             success = self.bot.run_bot_cycle()
             
             if success:
@@ -53,13 +159,38 @@ class BotScheduler:
         except Exception as e:
             logger.error(f"❌ Scheduled run #{self.run_count} failed: {e}")
         
+        if self.api_cache is not None:
+            self.api_cache.refresh(self.bot, tracer.last_run)
+        
         logger.info(f"📊 Total runs today: {self.run_count}")
+        logger.info(
+            f"🧰 Driver pool - cold starts: {self.driver_pool.cold_starts}, "
+            f"reuses: {self.driver_pool.reuses}, recycled: {self.driver_pool.recycled}"
+        )
+        if self.scrape_supervisor is not None:
+            logger.info(
+                f"🛡️ Scrape workers - runs: {self.scrape_supervisor.runs}, kills: {self.scrape_supervisor.kills}, "
+                f"restarts: {self.scrape_supervisor.restarts}, crashes: {self.scrape_supervisor.crashes}"
+            )
     
-    def setup_schedule(self):
-        """Set up the daily schedule - 5 times per day."""
+    def start_api(self):
+        """
+        Serve the latest results over HTTP from a background thread.
+        
+        Returns:
+            ApiServer: The running server
+        """
+        from api_server import ApiCache, ApiServer
         
-        # Define the 5 daily run times
-        run_times = ["08:00", "11:00", "14:00", "17:00", "20:00"]
+        self.api_cache = ApiCache()
+        self.api_cache.load_snapshot(SnapshotStore(os.path.join(self.config.bot_state_dir, "snapshot.json")))
+        server = ApiServer(self.api_cache, host=self.config.api_host, port=self.config.api_port)
+        server.start_in_thread()
+        return server
+    
+    def setup_schedule(self):
+        """Set up the daily schedule (SCHEDULE_TIMES, 5 times per day by default)."""
+        run_times = self.config.schedule_times
         
         logger.info("⏰ Setting up daily schedule:")
         for run_time in run_times:
@@ -68,6 +199,60 @@ class BotScheduler:
         
         logger.info(f"✅ Scheduled {len(run_times)} daily runs")
     
+    def _install_signal_handlers(self):
+        """Stop gracefully on SIGTERM (and SIGINT) after the current run."""
+        def handle_stop(signum, frame):
+            logger.info(f"📴 Received {signal.Signals(signum).name}, finishing current work and shutting down")
+            self._stop.set()
+        
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+    
+    def _last_run_changed(self):
+        """True if the most recent run saw added or removed destinations."""
+        last_diff = getattr(self.bot, "last_diff", None)
+        return bool(last_diff and (last_diff[0] or last_diff[1]))
+    
+    def run_daemon(self):
+        """Long-running loop that adapts the poll interval to how often the list changes."""
+        poller = AdaptivePoller(
+            min_interval=self.config.poll_min_interval,
+            max_interval=self.config.poll_max_interval,
+            backoff=self.config.poll_backoff,
+        )
+        quiet_window = parse_quiet_hours(self.config.quiet_hours)
+        
+        logger.info("🤖 WhatsApp Bot Daemon Starting")
+        logger.info(f"⏱️ Poll interval {poller.min_interval}s - {poller.max_interval}s (backoff x{poller.backoff})")
+        if quiet_window:
+            logger.info(f"🌙 Quiet hours: {quiet_window[0].strftime('%H:%M')}-{quiet_window[1].strftime('%H:%M')}")
+        
+        self._install_signal_handlers()
+        try:
+            while not self._stop.is_set():
+                quiet_until = quiet_hours_end(datetime.now(), quiet_window)
+                if quiet_until:
+                    logger.info(f"🌙 Quiet hours, sleeping until {quiet_until.strftime('%H:%M')}")
+                    self._stop.wait((quiet_until - datetime.now()).total_seconds())
+                    continue
+                
+                self.run_scheduled_task()
+                
+                changed = self._last_run_changed()
+                interval = poller.next_interval(changed)
+                next_run = datetime.now() + timedelta(seconds=interval)
+                logger.info(
+                    f"{'🔔 Change detected' if changed else '💤 No change'}, "
+                    f"next run in {interval / 60:.1f} min at {next_run.strftime('%H:%M:%S')}"
+                )
+                self._stop.wait(interval)
+            
+            logger.info("🛑 Daemon stopped")
+        except Exception as e:
+            logger.error(f"❌ Daemon error: {e}")
+        finally:
+            self.driver_pool.close()
+    
     def run_scheduler(self):
         """Main scheduler loop."""
         logger.info("🤖 WhatsApp Bot Scheduler Starting")
@@ -82,20 +267,36 @@ class BotScheduler:
         
         logger.info("🔄 Scheduler running... (Press Ctrl+C to stop)")
         
+        self._install_signal_handlers()
         try:
-            while True:
+            while not self._stop.is_set():
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                self._stop.wait(60)  # Check every minute
+            logger.info("🛑 Scheduler stopped by signal")
                 
         except KeyboardInterrupt:
             logger.info("🛑 Scheduler stopped by user")
         except Exception as e:
             logger.error(f"❌ Scheduler error: {e}")
+        finally:
+            self.driver_pool.close()
 
 def main():
     """Main function to start the scheduler."""
+    parser = argparse.ArgumentParser(description="Run the Tustus bot on a schedule.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Poll continuously with an adaptive interval instead of fixed daily times")
+    parser.add_argument("--serve", action="store_true",
+                        help="Also serve the latest destinations, diff and timings over HTTP")
+    args = parser.parse_args()
+    
     scheduler = BotScheduler()
-    scheduler.run_scheduler()
+    if args.serve:
+        scheduler.start_api()
+    if args.daemon:
+        scheduler.run_daemon()
+    else:
+        scheduler.run_scheduler()
 
 if __name__ == "__main__":
     main()
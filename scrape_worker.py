@@ -0,0 +1,154 @@
+"""
+Isolated Scrape Worker
+======================
+Runs the scrape stage in a supervised child process so a hung driver.get
+or a runaway Chrome cannot block the caller.
+
+The supervisor enforces a wall-clock deadline and an RSS limit on the
+whole worker tree (worker, chromedriver, Chrome). When either is exceeded
+the tree is killed, including orphaned browser processes, and the scrape
+is retried in a fresh worker. Results come back over a pipe.
+"""
+
+import multiprocessing
+import os
+import time
+
+from process_tree import kill_tree, tree_rss_bytes
+
+
+def _worker_main(conn, url, prefetched, config):
+    """Child entry point: scrape url with config and send (status, payload, spans) back."""
+    # Own session, so the supervisor can kill the worker and its browsers as a group
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    try:
+        from dataclasses import replace
+
+        from config import get_config
+        from metrics import tracer
+        from whatsapp_bot import WhatsAppBot
+
+        # The caller's config, not the worker's environment; the worker itself
+        # must scrape in-process, never spawn another worker
+        bot = WhatsAppBot(config=replace(config or get_config(), scrape_isolation="none"))
+        if prefetched is not None:
+            bot._prefetched = (url, prefetched)
+        result = bot.scrape_data(url)
+        conn.send(("ok", result, tracer.spans))
+    except Exception as e:
+        conn.send(("error", str(e), []))
+    finally:
+        conn.close()
+
+
+class ScrapeSupervisor:
+    """Runs scrapes in child processes with a deadline and a memory cap."""
+
+    def __init__(self, deadline=120.0, rss_limit_mb=1024, retries=1, poll_interval=0.25):
+        """
+        Args:
+            deadline (float): Wall-clock seconds allowed per attempt
+            rss_limit_mb (int): Maximum RSS of the worker tree (0 disables)
+            retries (int): Fresh workers to try after a kill or crash
+            poll_interval (float): Seconds between health checks
+        """
+        self.deadline = deadline
+        self.rss_limit = rss_limit_mb * 1024 * 1024
+        self.retries = max(0, retries)
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context("spawn")
+
+        # Statistics
+        self.runs = 0
+        self.kills = 0
+        self.restarts = 0
+        self.crashes = 0
+        self.last_peak_rss = 0
+
+    def scrape(self, url, prefetched=None, config=None):
+        """
+        Scrape url in a supervised worker, restarting it after a kill or crash.
+
+        Args:
+            url (str): The target website URL
+            prefetched (bytes): Page body already downloaded by the pre-check
+            config (BotConfig): Settings for the worker's bot (pickled to it),
+                defaults to the worker's get_config()
+
+        Returns:
+            tuple: (result, spans) where result is the destination list or
+            None if every attempt failed, and spans are the worker's tracer spans
+        """
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.restarts += 1
+                print(f"🔁 Restarting scrape worker (attempt {attempt + 1}/{self.retries + 1})")
+
+            completed, result, spans = self._run_worker(url, prefetched, config)
+            if completed:
+                return result, spans
+        return None, []
+
+    def _run_worker(self, url, prefetched, config):
+        """
+        Start one worker and watch it until it answers, dies or is killed.
+
+        Returns:
+            tuple: (completed, result, spans); completed is False when the
+            worker was killed or crashed and a retry makes sense
+        """
+        self.runs += 1
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(target=_worker_main, args=(sender, url, prefetched, config))
+        process.start()
+        sender.close()
+
+        start = time.monotonic()
+        peak_rss = 0
+        try:
+            while True:
+                if receiver.poll(self.poll_interval):
+                    try:
+                        status, payload, spans = receiver.recv()
+                    except EOFError:
+                        self.crashes += 1
+                        print("❌ Scrape worker exited without a result")
+                        return False, None, []
+                    process.join(10)
+                    if status == "error":
+                        print(f"❌ Scrape worker error: {payload}")
+                        return True, None, spans
+                    return True, payload, spans
+
+                if not process.is_alive():
+                    self.crashes += 1
+                    print(f"❌ Scrape worker died (exit code {process.exitcode})")
+                    return False, None, []
+
+                elapsed = time.monotonic() - start
+                if elapsed > self.deadline:
+                    print(f"⏰ Scrape worker exceeded {self.deadline:.0f}s deadline, killing it")
+                    self._kill(process)
+                    return False, None, []
+
+                rss = tree_rss_bytes(process.pid)
+                peak_rss = max(peak_rss, rss)
+                if self.rss_limit and rss > self.rss_limit:
+                    print(f"🧨 Scrape worker tree using {rss / 1048576:.0f} MB "
+                          f"(limit {self.rss_limit / 1048576:.0f} MB), killing it")
+                    self._kill(process)
+                    return False, None, []
+        finally:
+            self.last_peak_rss = peak_rss
+            receiver.close()
+            if process.is_alive():
+                self._kill(process)
+
+    def _kill(self, process):
+        """Kill the worker together with chromedriver and Chrome."""
+        killed = kill_tree(process.pid)
+        process.join(5)
+        self.kills += 1
+        print(f"🔪 Killed {killed} process(es) from the scrape worker tree")
@@ -0,0 +1,108 @@
+"""
+Destination Snapshot Store
+==========================
+Persists the last-seen destination list as a compact JSON file keyed by
+content hash, so each cycle can work out what was added or removed and
+only notify when something actually changed.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from atomic_file import atomic_write_json
+
+
+class SnapshotStore:
+    """JSON-file store holding the last destination snapshot and a short change history."""
+
+    def __init__(self, path, history_limit=100):
+        """
+        Args:
+            path (str): Location of the snapshot JSON file
+            history_limit (int): Number of past changes to keep
+        """
+        self.path = path
+        self.history_limit = history_limit
+        self._state = None
+
+    @staticmethod
+    def content_hash(items):
+        """
+        Order-independent hash of a destination list.
+
+        Args:
+            items (list): Destination names
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for item in sorted(set(items)):
+            digest.update(item.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def load(self):
+        """
+        Load the stored snapshot (cached after the first read).
+
+        Returns:
+            dict: Snapshot with "hash", "items", "updated_at" and "history"
+        """
+        if self._state is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except FileNotFoundError:
+                self._state = {"hash": None, "items": [], "updated_at": None, "history": []}
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read snapshot {self.path}, starting fresh: {e}")
+                self._state = {"hash": None, "items": [], "updated_at": None, "history": []}
+        return self._state
+
+    def diff(self, items):
+        """
+        Compare a freshly scraped list against the stored snapshot.
+
+        Args:
+            items (list): Destination names from the current cycle
+
+        Returns:
+            tuple: (added, removed) lists, both in page order
+        """
+        state = self.load()
+        if state["hash"] == self.content_hash(items):
+            return [], []
+
+        previous = set(state["items"])
+        current = set(items)
+        added = [item for item in items if item not in previous]
+        removed = [item for item in state["items"] if item not in current]
+        return added, removed
+
+    def save(self, items, added, removed):
+        """
+        Store items as the new snapshot and record the change in the history.
+
+        Args:
+            items (list): Destination names from the current cycle
+            added (list): Items new since the previous snapshot
+            removed (list): Items gone since the previous snapshot
+        """
+        state = self.load()
+        now = datetime.now().isoformat(timespec="seconds")
+        content_hash = self.content_hash(items)
+
+        history = state.get("history", [])
+        history.append({"at": now, "hash": content_hash, "added": added, "removed": removed})
+
+        self._state = {
+            "hash": content_hash,
+            "items": list(items),
+            "updated_at": now,
+            "history": history[-self.history_limit:],
+        }
+
+        # Write atomically so an interrupted run never leaves a corrupt snapshot
+        atomic_write_json(self.path, self._state, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,150 @@
+"""
+Destination Subscriptions
+=========================
+Lets many subscribers each watch particular destinations and get an email
+only for the new destinations that match.
+
+Subscriptions are read from a JSON file (SUBSCRIPTIONS_FILE, default
+subscriptions.json):
+
+    {
+        "subscribers": [
+            {"email": "dana@example.com", "watch": ["paris", "ברצלונה", "new y*"]}
+        ]
+    }
+
+A watch term matches a destination when every word of the term is a word
+of the destination name. Both sides are normalized with destination_key()
+(case, accents, Hebrew niqqud and final letters), and a word ending in "*"
+matches any word starting with it ("new y*" matches "New York").
+
+Entries without a plausible email address are skipped with a warning, so
+one typo cannot make Resend reject a whole batch of alerts.
+
+Every term is indexed under its most selective word, so resolving a cycle's
+new destinations only looks at the terms sharing a word (or a word prefix)
+with them, instead of checking every term of every subscriber.
+"""
+
+import json
+import re
+from collections import defaultdict
+
+from destinations import destination_key
+
+# One "@", no whitespace and a dot in the domain; Resend does the real validation
+_EMAIL_ADDRESS = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def _parse_term(term):
+    """Normalized (word, is_prefix) pairs of a watch term, or () if it has no words."""
+    words = []
+    for word in destination_key(term).split():
+        is_prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            words.append((word, is_prefix))
+    return tuple(words)
+
+
+class SubscriptionIndex:
+    """Inverted index from destination words to subscribers' watch terms."""
+
+    def __init__(self):
+        self._terms = []                   # term id -> (email, words)
+        self._exact = defaultdict(list)    # word -> term ids
+        self._prefix = defaultdict(list)   # word prefix -> term ids
+        self._longest_prefix = 0
+        self.subscribers = set()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, email, terms):
+        """
+        Register a subscriber's watch terms.
+
+        Args:
+            email (str): Subscriber address
+            terms (list): Watch terms such as "paris" or "new y*"
+        """
+        self.subscribers.add(email)
+        for term in terms:
+            words = _parse_term(term)
+            if not words:
+                continue
+            term_id = len(self._terms)
+            self._terms.append((email, words))
+
+            # Exact words are more selective than prefixes, longer more than shorter
+            word, is_prefix = max(words, key=lambda entry: (not entry[1], len(entry[0])))
+            if is_prefix:
+                self._prefix[word].append(term_id)
+                self._longest_prefix = max(self._longest_prefix, len(word))
+            else:
+                self._exact[word].append(term_id)
+
+    def _candidates(self, words):
+        """Ids of the terms indexed under one of a destination's words."""
+        candidates = set()
+        for word in words:
+            candidates.update(self._exact.get(word, ()))
+            for length in range(1, min(len(word), self._longest_prefix) + 1):
+                candidates.update(self._prefix.get(word[:length], ()))
+        return candidates
+
+    @staticmethod
+    def _matches(term_words, words):
+        for word, is_prefix in term_words:
+            if is_prefix:
+                if not any(candidate.startswith(word) for candidate in words):
+                    return False
+            elif word not in words:
+                return False
+        return True
+
+    def match(self, destinations):
+        """
+        Resolve destinations to the subscribers watching them.
+
+        Args:
+            destinations (list): Destination names
+
+        Returns:
+            dict: Subscriber email -> matching destination names, in input order
+        """
+        batches = {}
+        for name in destinations:
+            words = set(destination_key(name).split())
+            recipients = {self._terms[term_id][0] for term_id in self._candidates(words)
+                          if self._matches(self._terms[term_id][1], words)}
+            for email in recipients:
+                batches.setdefault(email, []).append(name)
+        return batches
+
+
+def load_subscriptions(path):
+    """
+    Build a subscription index from a JSON file.
+
+    Args:
+        path (str): Subscriptions file, either {"subscribers": [...]} or a bare list
+
+    Returns:
+        SubscriptionIndex: The index (empty if the file lists nobody)
+
+    Raises:
+        OSError, ValueError, KeyError, TypeError: If the file cannot be read or parsed
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    entries = data.get("subscribers", []) if isinstance(data, dict) else data
+    index = SubscriptionIndex()
+    for entry in entries:
+        email = entry["email"]
+        if not isinstance(email, str) or not _EMAIL_ADDRESS.fullmatch(email.strip()):
+            print(f"⚠️ Skipping subscriber with invalid email address {email!r}")
+            continue
+        index.add(email.strip(), entry.get("watch", []))
+    return index
@@ -8,86 +8,497 @@ Author: Your Name
 Created: 2025
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
-import resend
+import argparse
+import json
+import sqlite3
+import sys
+import threading
 import time
 import os
 from datetime import datetime
-from dotenv import load_dotenv
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from config import get_config
+from destinations import Destination, names
+from chrome_profile import ChromeProfile
+from driver_resolver import resolve_chromedriver
+from scrape_worker import ScrapeSupervisor
+from snapshot_store import SnapshotStore
+from history_store import HistoryStore
+from run_lock import ResultCache, RunLock
+from subscriptions import SubscriptionIndex, load_subscriptions
+from conditional_fetch import ConditionalFetcher
+from email_delivery import DeliveryQueue
+from email_templates import EmailRenderer
+from metrics import tracer
+from process_tree import TreeSampler
 
-# Load environment variables from .env file
-load_dotenv()
+# Selenium, lxml, requests and resend are imported where they are first
+# used, so --check, the scheduler and early exits do not pay for them.
 
-# --- Configuration ---
-SECRETS_TARGET_URL = os.environ.get("SECRETS_TARGET_URL", "http://example.com/data")
-REQUEST_TIMEOUT = int(os.environ.get("REQUEST_TIMEOUT", "30"))
+# URL patterns passed to CDP Network.setBlockedURLs, grouped by resource type
+_BLOCKED_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"],
+    "media": ["mp4", "webm", "mp3", "m3u8", "ogg"],
+}
+
+# Third-party analytics and ad hosts blocked by the "tracker" type
+_TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "tiktok.com",
+]
+
+# JavaScript snippets used for readiness detection
+_COUNT_DESTINATIONS_JS = """
+    var dropList = document.getElementById('dropList_serach');
+    return dropList ? dropList.getElementsByTagName('li').length : 0;
+"""
+
+_WAIT_FOR_STABLE_LIST_JS = """
+    var timeoutMs = arguments[0], stableMs = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var finished = false, lastCount = -1, stableTimer = null, observer = null;
+    
+    function count() {
+        var dropList = document.getElementById('dropList_serach');
+        return dropList ? dropList.getElementsByTagName('li').length : 0;
+    }
+    function finish(ready) {
+        if (finished) return;
+        finished = true;
+        if (observer) observer.disconnect();
+        clearTimeout(stableTimer);
+        clearTimeout(deadline);
+        done(ready);
+    }
+    function check() {
+        var current = count();
+        if (current === lastCount) return;
+        lastCount = current;
+        clearTimeout(stableTimer);
+        if (current > 0) {
+            stableTimer = setTimeout(function () { finish(true); }, stableMs);
+        }
+    }
+    
+    var deadline = setTimeout(function () { finish(count() > 0); }, timeoutMs);
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+    check();
+"""
+
+
+# Returns [text, attributes] pairs for the unique, cleaned destination names in
+# page order, ready for Destination.from_item() (or null when the dropdown is
+# missing). Mirrors parse_destination_records().
+_EXTRACT_DESTINATIONS_JS = """
+    var dropList = document.getElementById('dropList_serach');
+    if (!dropList) return null;
+    
+    var items = dropList.getElementsByTagName('li');
+    var seen = new Set(), result = [];
+    for (var i = 0; i < items.length; i++) {
+        var text = (items[i].textContent || '').replace(/\\s+/g, ' ').trim();
+        if (text.length > 2 && !seen.has(text)) {
+            seen.add(text);
+            var attributes = {};
+            for (var j = 0; j < items[i].attributes.length; j++) {
+                attributes[items[i].attributes[j].name] = items[i].attributes[j].value;
+            }
+            result.push([text, attributes]);
+        }
+    }
+    return result;
+"""
+
+# Compiled on first parse
+_DESTINATION_ITEMS_XPATH = None
+
+# Persistent profile managers, one per profile root; pooled and multi-target
+# driver starts run in parallel threads, so creation is locked
+_chrome_profiles = {}
+_chrome_profiles_lock = threading.Lock()
+
+
+def parse_destinations_html(html):
+    """
+    Parse the destination names out of raw page HTML.
+    
+    Args:
+        html (str | bytes): Page (or fragment) HTML
+        
+    Returns:
+        list: Destination names found under #dropList_serach, in page order
+    """
+    return names(parse_destination_records(html))
+
+
+def parse_destination_records(html):
+    """
+    Parse the destination dropdown into structured records.
+    
+    Args:
+        html (str | bytes): Page (or fragment) HTML
+        
+    Returns:
+        list: Destination records (name, key, price, date) under
+        #dropList_serach, in page order, one per distinct name
+    """
+    if not html:
+        return []
+    
+    global _DESTINATION_ITEMS_XPATH
+    from lxml import etree, html as lxml_html
+    
+    if _DESTINATION_ITEMS_XPATH is None:
+        _DESTINATION_ITEMS_XPATH = etree.XPath("//*[@id='dropList_serach']//li")
+    
+    try:
+        document = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return []
+    
+    records = []
+    seen = set()
+    for li in _DESTINATION_ITEMS_XPATH(document):
+        name = " ".join(li.text_content().split())
+        if len(name) > 2 and name not in seen:
+            seen.add(name)
+            records.append(Destination.from_item(name, li.attrib))
+    return records
+
+
+def fetch_static_destinations(url, config=None):
+    """
+    Fetch a page over plain HTTP and parse the dropdown without a browser.
+    
+    Args:
+        url (str): The target website URL
+        config (BotConfig): Settings to use, defaults to get_config()
+        
+    Returns:
+        list: Destination records ([] if the list is not in the static HTML)
+        or None if the request failed
+    """
+    import requests
+    
+    config = config or get_config()
+    with tracer.stage("static_fetch") as span:
+        try:
+            print(f"⚡ Fetching without browser: {url}")
+            response = requests.get(url, headers=config.http_headers, timeout=config.request_timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP fetch failed: {e}")
+            span["failed"] = True
+            return None
+        span["bytes"] = len(response.content)
+    
+    with tracer.stage("static_parse") as span:
+        destinations = parse_destination_records(response.content)
+        span["items"] = len(destinations)
+    return destinations
+
+
+def destination_fingerprint(html):
+    """
+    Stable fingerprint of a page for change detection.
+    
+    Uses the sorted destination list, so tokens and timestamps elsewhere
+    in the markup are ignored.
+    
+    Args:
+        html (bytes): Page HTML
+        
+    Returns:
+        str: Value to hash, or None when the list is not in the static HTML
+        (the shell of a JavaScript-rendered page says nothing about the list)
+    """
+    destinations = parse_destinations_html(html)
+    if destinations:
+        return "\n".join(sorted(destinations))
+    return None
+
+
+def blocked_url_patterns(config=None):
+    """
+    Build the CDP URL block list from BLOCK_RESOURCE_TYPES and BLOCK_ALLOWED_DOMAINS.
+    
+    BLOCK_ALLOWED_DOMAINS only exempts tracker hosts: the image, font,
+    stylesheet and media patterns match by extension on any host, since
+    setBlockedURLs has no way to exclude a domain from a wildcard.
+    
+    Args:
+        config (BotConfig): Settings to use, defaults to get_config()
+        
+    Returns:
+        list: Wildcard URL patterns understood by Network.setBlockedURLs
+    """
+    config = config or get_config()
+    patterns = []
+    for resource_type in config.block_resource_types:
+        for extension in _BLOCKED_EXTENSIONS.get(resource_type, []):
+            patterns.append(f"*.{extension}")
+            patterns.append(f"*.{extension}?*")
+    
+    if "tracker" in config.block_resource_types:
+        for domain in _TRACKER_DOMAINS:
+            if any(domain == allowed or domain.endswith("." + allowed) for allowed in config.block_allowed_domains):
+                continue
+            patterns.append(f"*://{domain}/*")
+            patterns.append(f"*://*.{domain}/*")
+    return patterns
+
+
+def collect_resource_stats(driver):
+    """
+    Drain Chrome's performance log and summarize network activity.
+    
+    Args:
+        driver (WebDriver): Session started with performance logging enabled
+        
+    Returns:
+        dict: requests, blocked, failed, bytes (encoded bytes received),
+        responses and cache_hits (responses served from the disk cache)
+    """
+    stats = {"requests": 0, "blocked": 0, "failed": 0, "bytes": 0, "responses": 0, "cache_hits": 0}
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return stats
+    
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif method == "Network.responseReceived":
+            stats["responses"] += 1
+            if params.get("response", {}).get("fromDiskCache"):
+                stats["cache_hits"] += 1
+        elif method == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            if params.get("blockedReason"):
+                stats["blocked"] += 1
+            else:
+                stats["failed"] += 1
+    return stats
+
+
+def _chrome_profile(config):
+    """Profile slot manager for config.chrome_profile_dir (None if disabled)."""
+    if not config.chrome_profile_dir:
+        return None
+    key = (config.chrome_profile_dir, config.chrome_cache_limit_mb)
+    with _chrome_profiles_lock:
+        if key not in _chrome_profiles:
+            _chrome_profiles[key] = ChromeProfile(config.chrome_profile_dir, config.chrome_cache_limit_mb)
+        return _chrome_profiles[key]
+
+
+def build_chrome_driver(config=None):
+    """
+    Start a new headless Chrome session with the bot's standard settings.
+    
+    Args:
+        config (BotConfig): Settings to use, defaults to get_config()
+        
+    Returns:
+        WebDriver: A ready-to-use Chrome WebDriver
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    
+    config = config or get_config()
+    chrome_options = Options()
+    
+    # Basic Chrome options
+    if config.headless:
+        chrome_options.add_argument("--headless=new")  # New headless mode
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    lean = config.browser_profile == "lean"
+    chrome_options.add_argument(f"--window-size={config.lean_window_size if lean else config.window_size}")
+    
+    # Disable unnecessary features
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-popup-blocking")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-infobars")
+    chrome_options.add_argument("--disable-web-security")  # Allow cross-origin requests
+    # Chrome only honours the last --disable-features, so build a single list
+    disabled_features = ["IsolateOrigins", "site-per-process"]  # Disable site isolation
+    
+    # Lean profile for small runners: fewer, smaller renderers and no background work
+    if lean:
+        disabled_features += ["Translate", "MediaRouter", "OptimizationHints", "BackForwardCache",
+                              "AutofillServerCommunication"]
+        chrome_options.add_argument(f"--renderer-process-limit={config.renderer_process_limit}")
+        chrome_options.add_argument(f"--js-flags=--max-old-space-size={config.js_heap_mb}")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-domain-reliability")
+        chrome_options.add_argument("--disable-client-side-phishing-detection")
+        chrome_options.add_argument("--no-first-run")
+        chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
+    
+    # Performance optimizations
+    chrome_options.add_argument("--disable-logging")
+    chrome_options.add_argument("--disable-login-animations")
+    chrome_options.add_argument("--disable-prompts")
+    chrome_options.add_argument("--disable-translate")
+    chrome_options.add_argument("--disable-sync")
+    
+    # Additional options for stability and to avoid detection
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    
+    # User agent to avoid detection
+    chrome_options.add_argument(f'--user-agent={config.user_agent}')
+    
+    # Resource blocking: content settings
+    if config.block_resources and "image" in config.block_resource_types:
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+    
+    # Network log for request, byte and cache-hit accounting
+    if config.network_stats:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    
+    cold_start = time.perf_counter()
+    with tracer.stage("driver_resolve") as span:
+        driver_path, span["source"] = resolve_chromedriver(
+            explicit_path=config.chrome_driver_path,
+            cache_path=os.path.join(config.bot_state_dir, "chromedriver.json"),
+        )
+        driver_source = span["source"]
+        resolve_seconds = time.perf_counter() - cold_start
+    
+    # Persistent profile: reuse cookies and cached assets from earlier runs.
+    # Claimed only once chromedriver is resolved, and always released, so a
+    # failed start never strands a slot.
+    profile = _chrome_profile(config)
+    profile_slot = None
+    try:
+        if profile is not None:
+            profile_slot = profile.claim()
+            chrome_options.add_argument(f"--user-data-dir={profile_slot}")
+            chrome_options.add_argument(f"--disk-cache-dir={profile.cache_dir(profile_slot)}")
+            if config.chrome_cache_limit_mb:
+                chrome_options.add_argument(f"--disk-cache-size={config.chrome_cache_limit_mb * 1024 * 1024}")
+        
+        with tracer.stage("chrome_launch") as span:
+            if profile_slot:
+                span["profile"] = os.path.basename(profile_slot)
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+    finally:
+        if profile_slot:
+            profile.launched(profile_slot)
+    print(f"🚀 Chrome cold start {time.perf_counter() - cold_start:.2f}s "
+          f"(chromedriver from {driver_source} in {resolve_seconds:.2f}s)")
+    
+    # A failed setup must not leak the running Chrome (the caller never gets the driver)
+    try:
+        # Remove webdriver flag
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        if config.block_resources:
+            patterns = blocked_url_patterns(config)
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            print(f"🚫 Blocking {len(patterns)} URL patterns ({', '.join(config.block_resource_types)})")
+    except BaseException:
+        driver.quit()
+        raise
+    return driver
 
-# --- Resend Configuration ---
-RESEND_API_KEY = os.environ.get("RESEND_API_KEY")
-FROM_EMAIL = os.environ.get("FROM_EMAIL")
-TO_EMAIL = os.environ.get("TO_EMAIL")
-EMAIL_SUBJECT = os.environ.get("EMAIL_SUBJECT", "Tustus Destinations Update")
 
 class WhatsAppBot:
     """Main bot class that handles web scraping and WhatsApp messaging."""
     
-    def __init__(self):
+    def __init__(self, driver_pool=None, scrape_supervisor=None, config=None):
+        """
+        Args:
+            driver_pool (DriverPool): Optional pool of warm WebDrivers shared
+                across cycles. Without one, each scrape starts and quits its
+                own Chrome session.
+            scrape_supervisor (ScrapeSupervisor): Optional supervisor that runs
+                each scrape in an isolated worker process. Created from
+                SCRAPE_ISOLATION when not given.
+            config (BotConfig): Settings to use, defaults to get_config()
+        """
+        self.config = config = config or get_config()
         self.driver = None
+        self.driver_pool = driver_pool
+        if scrape_supervisor is None and config.scrape_isolation == "process":
+            scrape_supervisor = ScrapeSupervisor(
+                deadline=config.scrape_deadline,
+                rss_limit_mb=config.scrape_rss_limit_mb,
+                retries=config.scrape_worker_retries,
+            )
+        self.scrape_supervisor = scrape_supervisor
+        self.snapshot_store = SnapshotStore(os.path.join(config.bot_state_dir, "snapshot.json"))
+        self.fetcher = ConditionalFetcher(
+            os.path.join(config.bot_state_dir, "http_validators.json"),
+            headers=config.http_headers,
+            timeout=config.request_timeout,
+        )
+        self._prefetched = None
+        self.delivery = DeliveryQueue(
+            os.path.join(config.bot_state_dir, "outbox.jsonl"),
+            max_retries=config.email_max_retries,
+            rate_limit=config.email_rate_limit,
+            concurrency=config.email_concurrency,
+            api_key=config.resend_api_key,
+        )
+        self.renderer = EmailRenderer(preview_size=config.email_preview_size)
+        self.history = None
+        if config.history_enabled:
+            self.history = HistoryStore(os.path.join(config.bot_state_dir, "history.sqlite3"))
+        self.run_lock = RunLock(os.path.join(config.bot_state_dir, "run.lock"), stale_after=config.run_lock_stale)
+        self.result_cache = ResultCache(os.path.join(config.bot_state_dir, "last_scrape.json"),
+                                        ttl=config.result_cache_ttl)
+        self.subscriptions = None
+        if os.path.exists(config.subscriptions_file):
+            # A broken subscriptions file must not stop the main TO_EMAIL update
+            try:
+                self.subscriptions = load_subscriptions(config.subscriptions_file)
+                print(f"📇 Loaded {len(self.subscriptions.subscribers)} subscriber(s) "
+                      f"with {len(self.subscriptions)} watch term(s)")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Could not load subscriptions from {config.subscriptions_file}: {e}")
+                self.subscriptions = SubscriptionIndex()
+        self.last_destinations = None
+        self.last_diff = None
         self._initialize_resend()
     
     def _initialize_driver(self):
         """Initialize Selenium WebDriver with optimal settings."""
-        chrome_options = Options()
-        
-        # Basic Chrome options
-        chrome_options.add_argument("--headless=new")  # New headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        # Disable unnecessary features
-        chrome_options.add_argument("--disable-notifications")
-        chrome_options.add_argument("--disable-popup-blocking")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-infobars")
-        chrome_options.add_argument("--disable-web-security")  # Allow cross-origin requests
-        chrome_options.add_argument("--disable-features=IsolateOrigins,site-per-process")  # Disable site isolation
-        
-        # Performance optimizations
-        chrome_options.add_argument("--disable-logging")
-        chrome_options.add_argument("--disable-login-animations")
-        chrome_options.add_argument("--disable-prompts")
-        chrome_options.add_argument("--disable-translate")
-        chrome_options.add_argument("--disable-sync")
-        
-        # Additional options for stability and to avoid detection
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # User agent to avoid detection
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36')
-        
         try:
             print("🔧 Setting up Chrome WebDriver...")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Remove webdriver flag
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
+            self.driver = build_chrome_driver(self.config)
             print("✅ Chrome WebDriver initialized successfully.")
             return True
         except Exception as e:
@@ -96,29 +507,89 @@ class WhatsAppBot:
     
     def _initialize_resend(self):
         """Initialize Resend email client with API key."""
-        if not RESEND_API_KEY:
+        if not self.config.resend_api_key:
             print("❌ Resend API key not found")
             print("ℹ️ Get your API key from: https://resend.com/dashboard/api-keys")
             raise ValueError("Resend API key not found. Please check your .env file.")
         
-        if not TO_EMAIL:
+        if not self.config.to_emails:
             print("❌ Email configuration missing")
             print("Required environment variables:")
             print("- TO_EMAIL: Destination email address")
             raise ValueError("Email configuration missing. Please check your .env file.")
             
         # Use default Resend sender if not specified
-        global FROM_EMAIL
-        if not FROM_EMAIL:
-            FROM_EMAIL = "onboarding@resend.dev"
-            print("ℹ️ Using default Resend sender email: onboarding@resend.dev")
+        if not self.config.from_email:
+            print(f"ℹ️ Using default Resend sender email: {self.config.sender}")
         
-        # Initialize Resend with API key
-        resend.api_key = RESEND_API_KEY
+        # The key itself is handed to the SDK by the delivery queue on first send
         print("✅ Resend client initialized successfully")
     
     
     def scrape_data(self, url):
+        """
+        Scrapes destination data from the Tustus website.
+        
+        In "auto" mode the page is first fetched over plain HTTP and parsed
+        without a browser; Selenium is only started when the destination
+        list is not part of the static HTML.
+        
+        Args:
+            url (str): The target website URL
+            
+        Returns:
+            list: Destination records or None if failed
+        """
+        if self.config.scrape_mode in ("auto", "http"):
+            static_data = self._scrape_static(url)
+            if static_data:
+                print(f"✅ Successfully scraped {len(static_data)} destinations (HTTP fast path).")
+                return static_data
+            if self.config.scrape_mode == "http":
+                print("⚠️ No destinations found in static HTML.")
+                return [] if static_data is not None else None
+            print("↪️ Destination list not in static HTML, falling back to Selenium...")
+        
+        return self._scrape_with_selenium(url)
+    
+    def _scrape_static(self, url):
+        """
+        Fetch the target page over HTTP and parse the dropdown without a browser.
+        
+        Args:
+            url (str): The target website URL
+            
+        Returns:
+            list: Destination records ([] if the list is not in the
+            static HTML) or None if the request failed
+        """
+        # Reuse the body already downloaded by the pre-check stage
+        if self._prefetched and self._prefetched[0] == url:
+            body = self._prefetched[1]
+            self._prefetched = None
+            print("⚡ Parsing page downloaded by the pre-check")
+            with tracer.stage("static_parse", bytes=len(body)) as span:
+                destinations = parse_destination_records(body)
+                span["items"] = len(destinations)
+            return destinations
+        
+        return fetch_static_destinations(url, self.config)
+    
+    def scrape_with_browser(self, url):
+        """
+        Scrape url with Chrome, without trying the HTTP fast path first.
+        
+        Safe to call from several threads when the bot has a driver pool.
+        
+        Args:
+            url (str): The target website URL
+            
+        Returns:
+            list: Destination records or None if failed
+        """
+        return self._scrape_with_selenium(url)
+    
+    def _scrape_with_selenium(self, url):
         """
         Scrapes destination data from the Tustus website using Selenium.
         
@@ -126,26 +597,44 @@ class WhatsAppBot:
             url (str): The target website URL
             
         Returns:
-            list: Extracted destination items or None if failed
+            list: Destination records or None if failed
         """
-        if not self._initialize_driver():
+        # Pooled drivers stay local to this call so several scrapes can
+        # share one bot concurrently
+        if self.driver_pool is not None:
+            try:
+                driver = self.driver_pool.acquire()
+            except Exception as e:
+                print(f"❌ Error getting WebDriver from pool: {e}")
+                return None
+        elif self._initialize_driver():
+            driver = self.driver
+        else:
             return None
         
+        # Peak RSS and CPU time of chromedriver + Chrome while this scrape runs
+        sampler = None
+        service_process = getattr(getattr(driver, "service", None), "process", None)
+        if service_process is not None:
+            sampler = TreeSampler(service_process.pid, interval=self.config.browser_sample_interval).start()
+        
+        broken = False
         try:
-            print(f"🌐 Navigating to: {url}")
-            self.driver.get(url)
+            if self.config.network_stats:
+                # Discard network events left over from a previous pooled run
+                collect_resource_stats(driver)
             
-            # Wait for page to be fully loaded
-            wait = WebDriverWait(self.driver, 20)
-            wait.until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
-            print("✅ Page fully loaded")
+            print(f"🌐 Navigating to: {url}")
+            with tracer.stage("navigation"):
+                driver.get(url)
             
-            # Wait for any dynamic content to load
-            time.sleep(3)
+            # Wait for the destination list instead of a fixed sleep
+            with tracer.stage("readiness") as span:
+                span["ready"] = self._wait_for_destinations(driver)
             
             # Try to make the dropdown visible using JavaScript
             print("🔧 Trying to show dropdown...")
-            self.driver.execute_script("""
+            driver.execute_script("""
                 // Remove any hidden class and show the dropdown
                 var dropList = document.getElementById('dropList_serach');
                 if (dropList) {
@@ -165,7 +654,18 @@ class WhatsAppBot:
             """)
             
             # Extract the destinations
-            extracted_data = self._extract_target_data()
+            with tracer.stage("extraction") as span:
+                extracted_data = self._extract_target_data(driver)
+                span["items"] = len(extracted_data)
+            
+            if self.config.network_stats:
+                stats = collect_resource_stats(driver)
+                tracer.record("network", **stats)
+                print(f"📉 Network: {stats['requests']} requests, {stats['blocked']} blocked, "
+                      f"{stats['bytes'] / 1024:.1f} KB transferred")
+                if self.config.chrome_profile_dir and stats["responses"]:
+                    print(f"💽 Disk cache: {stats['cache_hits']}/{stats['responses']} responses "
+                          f"({stats['cache_hits'] / stats['responses'] * 100:.0f}% hit rate)")
             
             if extracted_data:
                 print(f"✅ Successfully scraped {len(extracted_data)} destinations.")
@@ -176,71 +676,92 @@ class WhatsAppBot:
                 
         except Exception as e:
             print(f"❌ Error during scraping: {e}")
+            broken = True
             return None
         finally:
-            if self.driver:
-                self.driver.quit()
+            if sampler is not None:
+                usage = sampler.stop()
+                tracer.record("browser_resources", **usage)
+                print(f"🧮 Browser: peak {usage['peak_rss_bytes'] / 1048576:.0f} MB RSS across "
+                      f"{usage['processes']} processes, {usage['cpu_s']:.2f}s CPU")
+            if self.driver_pool is not None:
+                self.driver_pool.release(driver, broken=broken)
+                print("↩️ WebDriver returned to pool.")
+            else:
+                driver.quit()
+                self.driver = None
                 print("🔒 WebDriver closed.")
     
-    def _extract_target_data(self):
+    def _wait_for_destinations(self, driver=None):
         """
-        Extract destination data from the Tustus website using Selenium.
+        Wait until the destination dropdown is populated.
+        
+        Uses READINESS_STRATEGY to decide between polling for the first
+        <li> and waiting for a MutationObserver to report a stable list.
         
+        Args:
+            driver (WebDriver): Session to wait on (defaults to self.driver)
+            
         Returns:
-            list: Extracted destination items
+            bool: True if the list became ready before READINESS_TIMEOUT
         """
-        extracted_items = []
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
         
+        driver = driver or self.driver
+        strategy = self.config.readiness_strategy
+        timeout = self.config.readiness_timeout
+        start = time.perf_counter()
         try:
-            print("🔍 Looking for dropList_serach element...")
-            
-            # Get the dropdown list directly since we've already made it visible
-            drop_list = self.driver.find_element(By.ID, "dropList_serach")
-            print("✅ Found dropList_serach element")
-            
-            # Get the HTML content directly
-            html_content = drop_list.get_attribute('innerHTML')
-            print("📄 Got dropdown HTML content")
-            
-            # Extract destinations using string manipulation
-            if html_content:
-                # Split by <li> tags and clean up
-                destinations = html_content.split('</li>')
-                for dest in destinations:
-                    # Clean up the HTML tags
-                    dest = dest.replace('<li>', '').strip()
-                    if dest and len(dest) > 2:
-                        extracted_items.append(dest)
-                        print(f"✅ Added destination from HTML: {dest}")
+            if strategy == "mutation":
+                driver.set_script_timeout(timeout + 5)
+                ready = bool(driver.execute_async_script(
+                    _WAIT_FOR_STABLE_LIST_JS, int(timeout * 1000), self.config.readiness_stable_ms
+                ))
+            else:
+                WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                    lambda d: d.execute_script(_COUNT_DESTINATIONS_JS) > 0
+                )
+                ready = True
+        except TimeoutException:
+            ready = False
+        
+        elapsed = time.perf_counter() - start
+        if ready:
+            print(f"✅ Destination list ready after {elapsed:.2f}s ({strategy})")
+        else:
+            print(f"⚠️ Destination list not ready after {elapsed:.2f}s ({strategy}), extracting anyway")
+        return ready
+    
+    def _extract_target_data(self, driver=None):
+        """
+        Extract destination data from the Tustus website using Selenium.
+        
+        The whole list is cleaned and de-duplicated inside the page and
+        returned by a single execute_script call, so the cost does not
+        grow with the number of <li> items.
+        
+        Args:
+            driver (WebDriver): Session to read from (defaults to self.driver)
             
-            # If no items found from HTML, try getting li elements directly
-            if not extracted_items:
-                print("🔍 Trying to get li elements directly...")
-                li_elements = drop_list.find_elements(By.TAG_NAME, "li")
-                print(f"📋 Found {len(li_elements)} li elements")
-                
-                for li in li_elements:
-                    destination = li.text.strip()
-                    if destination and len(destination) > 2:
-                        extracted_items.append(destination)
-                        print(f"✅ Added destination: {destination}")
-                
-                if extracted_items:
-                    print(f"✅ Successfully extracted {len(extracted_items)} destinations")
-                else:
-                    print("❌ No destination items found in the dropdown")
+        Returns:
+            list: Destination records (name, key, price, date)
+        """
+        driver = driver or self.driver
+        try:
+            print("🔍 Extracting destinations from dropList_serach...")
+            raw_items = driver.execute_script(_EXTRACT_DESTINATIONS_JS)
             
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_items = []
-            for item in extracted_items:
-                if item not in seen:
-                    seen.add(item)
-                    unique_items.append(item)
+            if raw_items is None:
+                print("❌ dropList_serach element not found")
+                return []
             
+            unique_items = [Destination.from_item(name, attributes) for name, attributes in raw_items]
             print(f"📊 Final result: {len(unique_items)} unique destinations")
             if unique_items:
-                print(f"📋 Sample destinations: {unique_items[:3]}")
+                print(f"📋 Sample destinations: {names(unique_items[:3])}")
+            else:
+                print("❌ No destination items found in the dropdown")
             
             return unique_items
             
@@ -248,128 +769,333 @@ class WhatsAppBot:
             print(f"❌ Error extracting data: {e}")
             return []
     
-    def send_email_update(self, data_list):
+    def build_email(self, data_list, diff=None, to=None, subject=None):
         """
-        Sends the scraped data via email using Resend API.
+        Render the update email for the scraped data.
         
         Args:
             data_list (list): The scraped data to send
-        """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create HTML email content
-        if not data_list:
-            html_content = f"""
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; direction: rtl;">
-                <h2 style="color: #333;">🤖 עדכון בוט - {timestamp}</h2>
-                <p style="color: #dc3545; background: #ffe5e5; padding: 10px; border-radius: 5px;">
-                    ❌ <strong>סטטוס:</strong> לא נמצאו יעדים
-                </p>
-                <p>האתר אינו זמין או שהמבנה שלו השתנה.</p>
-            </div>
-            """
-        else:
-            # Format the list nicely for HTML
-            if len(data_list) > 15:
-                list_preview = data_list[:15]
-                list_items = "\n".join([f'<li style="padding: 10px; border-bottom: 1px solid #dee2e6;">{item}</li>' for item in list_preview])
-                list_items += f'\n<li style="padding: 10px; color: #6c757d;">... ועוד {len(data_list) - 15} יעדים נוספים</li>'
-            else:
-                list_items = "\n".join([f'<li style="padding: 10px; border-bottom: 1px solid #dee2e6;">{item}</li>' for item in data_list])
+            diff (tuple): Optional (added, removed) lists; when given the
+                email shows the changes instead of the full list
+            to (str | list): Recipient(s), defaults to TO_EMAIL
+            subject (str): Subject line, defaults to EMAIL_SUBJECT
             
-            html_content = f"""
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; direction: rtl;">
-                <h2 style="color: #333;">🤖 עדכון יעדי טוסטוס - {timestamp}</h2>
-                <p style="color: #28a745; background: #e8f5e9; padding: 10px; border-radius: 5px;">
-                    ✅ <strong>נמצאו {len(data_list)} יעדים:</strong>
-                </p>
-                <ul style="list-style-type: none; padding: 0; margin: 20px 0; background: #f8f9fa; border-radius: 5px;">
-                    {list_items}
-                </ul>
-            </div>
-            """
+        Returns:
+            dict: Resend send parameters
+        """
+        html_content, text_content = self.renderer.render(data_list, diff=diff)
         
-        try:
-            # Send email using Resend
-            params = {
-                "from": FROM_EMAIL,
-                "to": TO_EMAIL,
-                "subject": EMAIL_SUBJECT,
-                "html": html_content,
-            }
-            
-            response = resend.Emails.send(params)
+        return {
+            "from": self.config.sender,
+            "to": to or list(self.config.to_emails),
+            "subject": subject or self.config.email_subject,
+            "html": html_content,
+            "text": text_content,
+        }
+    
+    def send_email_update(self, data_list, diff=None, to=None, subject=None, key=None):
+        """
+        Sends the scraped data via email using Resend API.
+        
+        Args:
+            data_list (list): The scraped data to send
+            diff (tuple): Optional (added, removed) lists; when given the
+                email shows the changes instead of the full list
+            to (str | list): Recipient(s), defaults to TO_EMAIL
+            subject (str): Subject line, defaults to EMAIL_SUBJECT
+            key (str): Delivery key; replaces an undelivered outbox message
+                with the same key instead of sending both
             
+        Returns:
+            bool: True if the email was delivered
+        """
+        params = self.build_email(data_list, diff=diff, to=to, subject=subject)
+        
+        # Queue and flush: retries with backoff, leftovers go to the outbox
+        message = self.delivery.enqueue(params, key=key)
+        with tracer.stage("email_send", bytes=len(params["html"].encode("utf-8"))) as span:
+            sent, failed = self.delivery.flush()
+            span["sent"], span["failed"] = len(sent), len(failed)
+        
+        if any(item is message for item in sent):
             print(f"✅ Email sent successfully!")
-            print(f"📧 Email ID: {response['id']}")
             return True
+        return False
+    
+    def notify_subscribers(self, added):
+        """
+        Email every subscriber the new destinations matching their watch list.
+        
+        Args:
+            added (list): Destinations added since the last run
             
-        except Exception as e:
-            print(f"❌ Failed to send email: {e}")
-            
-            # Try to send error notification
-            try:
-                error_html = f"""
-                <h2>🤖 Bot Error - {timestamp}</h2>
-                <p style="color: red;">❌ Failed to send scheduled update.</p>
-                <p><strong>Error:</strong> {str(e)}</p>
-                """
-                
-                resend.Emails.send({
-                    "from": FROM_EMAIL,
-                    "to": TO_EMAIL,
-                    "subject": "Bot Error: Tustus Update Failed",
-                    "html": error_html,
-                })
-                print("📧 Error notification email sent.")
-            except:
-                print("❌ Could not send error notification.")
-            
-            return False
+        Returns:
+            int: Number of subscriber emails delivered
+        """
+        if not self.subscriptions or not added:
+            return 0
+        
+        with tracer.stage("subscriber_match", items=len(added)) as span:
+            batches = self.subscriptions.match(added)
+            span["recipients"] = len(batches)
+        if not batches:
+            print("📇 No subscriber is watching the new destinations")
+            return 0
+        
+        for email, matched in batches.items():
+            subject = f"{self.config.email_subject}: {len(matched)} new destination(s) you watch"
+            self.delivery.enqueue(self.build_email(matched, diff=(matched, []), to=email, subject=subject))
+        with tracer.stage("subscriber_send", recipients=len(batches)) as span:
+            sent, failed = self.delivery.flush()
+            span["sent"], span["failed"] = len(sent), len(failed)
+        
+        print(f"📬 Subscriber alerts: {len(sent)} sent, {len(failed)} left for retry")
+        return len(sent)
     
     def run_bot_cycle(self):
         """Execute one complete bot cycle: scrape data and send WhatsApp message."""
         print(f"\n🚀 Starting bot cycle at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 50)
         
+        tracer.start_run()
+        flushes = self.delivery.flushes
+        outcome, success = "error", False
+        try:
+            # Single flight: an overlapping invocation waits, then reuses the fresh result
+            with tracer.stage("run_lock") as span:
+                span["acquired"] = self.run_lock.acquire(wait=self.config.run_lock_wait)
+            if span["acquired"]:
+                try:
+                    outcome, success = self._execute_cycle()
+                finally:
+                    self.run_lock.release()
+            else:
+                print("🔒 Another bot cycle still holds the run lock, skipping this one")
+                outcome, success = "locked", True
+        finally:
+            try:
+                # Skipped and unchanged cycles send nothing, so retry the outbox here
+                if self.delivery.flushes == flushes:
+                    self._retry_outbox()
+            finally:
+                tracer.finish_run(success=success, outcome=outcome)
+        
+        print("=" * 50)
+        print(f"✅ Bot cycle completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({outcome})")
+        
+        return success
+    
+    def _execute_cycle(self):
+        """
+        Run the stages of a bot cycle.
+        
+        Returns:
+            tuple: (outcome, success) where outcome is one of "invalid-config",
+            "skipped", "scrape-failed", "unchanged" or "notified"
+        """
         # Validate configuration
         if not self._validate_configuration():
-            return False
+            return "invalid-config", False
+        
+        # A cycle that just finished (or that we waited for) already scraped
+        records = self.result_cache.get(self.config.target_url)
+        if records is not None:
+            tracer.record("result_cache", hit=True, items=len(records))
+        else:
+            # Cheap conditional fetch: stop before starting a browser if nothing changed
+            if self.config.precheck_enabled:
+                with tracer.stage("precheck") as span:
+                    span["skipped"] = self._precheck_unchanged(self.config.target_url)
+                if span["skipped"]:
+                    return "skipped", True
+            
+            # Scrape data
+            with tracer.stage("scrape") as span:
+                records = self._scrape_target(self.config.target_url)
+                span["items"] = len(records or [])
+            
+            if not records:
+                # Scrape failed or came back empty: report it, keep the last snapshot
+                return "scrape-failed", self.send_email_update(names(records),
+                                                            key=f"status:{self.config.target_url}")
+            
+            self._record_history(records)
+            self.result_cache.put(self.config.target_url, records)
         
-        # Scrape data
-        scraped_data = self.scrape_data(SECRETS_TARGET_URL)
+        scraped_data = names(records)
+        self.last_destinations = scraped_data
         
-        # Send email update
-        success = self.send_email_update(scraped_data)
+        added, removed = self.snapshot_store.diff(scraped_data)
+        self.last_diff = (added, removed)
+        tracer.record("diff", added=len(added), removed=len(removed))
         
-        print("=" * 50)
-        print(f"✅ Bot cycle completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if not added and not removed:
+            print("💤 No destination changes since the last run, skipping email.")
+            outcome, success = "unchanged", True
+        else:
+            print(f"🔄 Changes detected: {len(added)} added, {len(removed)} removed")
+            outcome = "notified"
+            # The snapshot only advances once this is delivered, so the next cycle
+            # re-detects the same change; its email replaces this one in the outbox
+            success = self.send_email_update(scraped_data, diff=(added, removed),
+                                             key=f"update:{self.config.target_url}")
+            
+            # Only advance the snapshot once the change was delivered
+            if success:
+                self.snapshot_store.save(scraped_data, added, removed)
+                # Alert subscribers once per addition: failed alerts wait in
+                # the outbox instead of holding the snapshot back
+                self.notify_subscribers(added)
         
-        return success
+        # Remember the page validators so the next run can short-circuit
+        if success and self.config.precheck_enabled:
+            # Selenium mode never reads the static list, so its validators can't vouch for it
+            self.fetcher.commit(static_list=self.config.scrape_mode != "selenium")
+        
+        return outcome, success
+    
+    def _retry_outbox(self):
+        """
+        Resend messages left in the outbox by earlier cycles.
+        
+        Retakes the run lock without waiting: while another cycle holds it,
+        that cycle flushes the outbox, and flushing here as well could send
+        the same message twice.
+        """
+        if not self.run_lock.acquire():
+            return
+        try:
+            with tracer.stage("outbox_retry") as span:
+                sent, failed = self.delivery.flush()
+                span["sent"], span["failed"] = len(sent), len(failed)
+        except Exception as e:
+            print(f"⚠️ Could not retry the outbox: {e}")
+        finally:
+            self.run_lock.release()
+    
+    def _scrape_target(self, url):
+        """
+        Scrape url in-process, or in an isolated worker when a supervisor is set.
+        
+        Args:
+            url (str): The target website URL
+            
+        Returns:
+            list: Destination records or None if failed
+        """
+        if self.scrape_supervisor is None:
+            return self.scrape_data(url)
+        
+        prefetched = None
+        if self._prefetched and self._prefetched[0] == url:
+            prefetched = self._prefetched[1]
+            self._prefetched = None
+        
+        result, spans = self.scrape_supervisor.scrape(url, prefetched=prefetched, config=self.config)
+        tracer.extend(spans)
+        
+        supervisor = self.scrape_supervisor
+        tracer.record("scrape_worker", peak_rss_bytes=supervisor.last_peak_rss,
+                      kills=supervisor.kills, restarts=supervisor.restarts)
+        print(f"🛡️ Scrape worker: peak tree RSS {supervisor.last_peak_rss / 1048576:.0f} MB, "
+              f"{supervisor.kills} kill(s), {supervisor.restarts} restart(s) so far")
+        return result
+    
+    def _record_history(self, records, target="default"):
+        """
+        Append a scrape to the destination history (failures are only logged).
+        
+        Args:
+            records (list): Destination records from the cycle
+            target (str): Name of the watched page
+        """
+        if self.history is None:
+            return
+        with tracer.stage("history", items=len(records)):
+            try:
+                self.history.append(records, target=target)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not record destination history: {e}")
+    
+    def _precheck_unchanged(self, url):
+        """
+        Run the conditional fetch pre-check stage.
+        
+        Args:
+            url (str): The target website URL
+            
+        Returns:
+            bool: True if the page is unchanged and the cycle can stop early
+        """
+        print("🔎 Pre-checking target for changes...")
+        result = self.fetcher.check(url, fingerprint=destination_fingerprint)
+        skips, checks, rate = self.fetcher.skip_rate
+        
+        if result.unchanged:
+            print(f"💤 Target unchanged ({result.reason}), skipping scrape and email.")
+        else:
+            print(f"🔄 Pre-check: {result.reason}")
+            if result.body is not None:
+                self._prefetched = (url, result.body)
+        print(f"📈 Pre-check skip rate: {skips}/{checks} runs ({rate:.0f}%)")
+        return result.unchanged
     
     def _validate_configuration(self):
         """Validate that all required configuration is present."""
-        required_vars = {
-            "SECRETS_TARGET_URL": SECRETS_TARGET_URL,
-            "RESEND_API_KEY": RESEND_API_KEY,
-            "FROM_EMAIL": FROM_EMAIL,
-            "TO_EMAIL": TO_EMAIL,
-            "EMAIL_SUBJECT": EMAIL_SUBJECT,
-        }
-        
-        missing_vars = [var for var, value in required_vars.items() if not value]
+        problems = self.config.validate()
         
-        if missing_vars:
-            print("❌ Missing required configuration:")
-            for var in missing_vars:
-                print(f"   - {var}")
+        if problems:
+            print("❌ Invalid configuration:")
+            for problem in problems:
+                print(f"   - {problem}")
             print("\nPlease check your .env file and ensure all variables are set.")
             return False
         
         return True
 
+def check_configuration():
+    """
+    Validate the configuration without starting a browser or loading the
+    Selenium, requests and Resend packages.
+    
+    Returns:
+        bool: True if a bot cycle could run with this configuration
+    """
+    start = time.perf_counter()
+    try:
+        config = get_config()
+    except ValueError as e:
+        print(f"❌ Configuration check failed:\n   - {e}")
+        return False
+    
+    problems = config.validate()
+    try:
+        os.makedirs(config.bot_state_dir, exist_ok=True)
+        if not os.access(config.bot_state_dir, os.W_OK):
+            problems.append(f"BOT_STATE_DIR is not writable: {config.bot_state_dir}")
+    except OSError as e:
+        problems.append(f"BOT_STATE_DIR cannot be created: {e}")
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if problems:
+        print("❌ Configuration check failed:")
+        for problem in problems:
+            print(f"   - {problem}")
+        return False
+    
+    print(f"✅ Configuration OK (checked in {elapsed_ms:.1f} ms)")
+    config.print_configuration()
+    return True
+
 def main():
     """Main function to run the WhatsApp bot."""
+    parser = argparse.ArgumentParser(description="Scrape Tustus destinations and email the changes")
+    parser.add_argument("--check", action="store_true", help="Validate the configuration and exit")
+    args = parser.parse_args()
+    
+    if args.check:
+        sys.exit(0 if check_configuration() else 1)
+    
     try:
         bot = WhatsAppBot()
         bot.run_bot_cycle()